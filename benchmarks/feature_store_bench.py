@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from src.morphemes_nd import Characteristic, Grapheme, Language
+
+
+class DictFeatured:
+    '''
+    What a Featured element used to be: the same attributes and its own dict of features
+    '''
+    def __init__(self, name: str, language: Language, **features):
+        self.name = name
+        self.language = language
+        self._features: dict = features
+        language.graphemes[name] = self
+
+
+def features_of(i: int) -> dict:
+    return {'vowel': i % 5 == 0, 'tone': i % 5, 'ipa': f'ipa{i % 40}'}
+
+
+def traced(fn) -> tuple[object, float]:
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / 2**20
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory of per-element feature dicts vs the language feature table')
+    parser.add_argument('-n', '--elements', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    language = Language('synthetic', [], [Characteristic(feature, [], []) for feature in features_of(0)])
+    _, dicts = traced(lambda: [DictFeatured(f'g{i}', language, **features_of(i)) for i in range(args.elements)])
+    language.graphemes.clear()
+    _, table = traced(lambda: [Grapheme(f'g{i}', **features_of(i)) for i in range(args.elements)])
+    print(f'{args.elements} elements with {len(features_of(0))} features')
+    print(f'{"feature dicts":>14}: {dicts:8.1f} MiB')
+    print(f'{"feature table":>14}: {table:8.1f} MiB   (x{dicts / table:.1f}), {language.feature_table.nbytes() / 2**20:.1f} MiB of it in the table')
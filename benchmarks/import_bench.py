@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+
+
+def import_time_us(module: str) -> int:
+    '''
+    The cumulative import time of a module in a fresh interpreter, as reported by -X importtime
+    '''
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    return next(int(line.split('|')[1]) for line in reversed(stderr.splitlines()) if line.split('|')[-1].strip() == module)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import time of the entry points of src next to their lazily loaded dependencies')
+    parser.add_argument('-r', '--runs', type=int, default=5)
+    parser.add_argument('modules', nargs='*', default=['src.lang_factory', 'src.morphemes', 'src.rules'])
+    args = parser.parse_args()
+
+    best = lambda module: min(import_time_us(module) for _ in range(args.runs))
+    dependencies = {module: best(module) for module in ('yaml', 'strictyaml', 'numpy')}
+    for module in args.modules:
+        import_time = best(module)
+        relative = ', '.join(f'x{import_time / time:.2f} of {name}' for name, time in dependencies.items())
+        print(f'{module:>18}: {import_time / 1000:7.1f} ms ({relative})')
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.snapshot_bench import timed
+from benchmarks.synthetic import grapheme_name
+from src.morphemes import By, SimpleMorphemeND, Side
+from src.segmentation import SegmentedWord, Segmenter
+
+MORPHEMES = {
+    'prefix': lambda: SimpleMorphemeND('', 'pre', at=1),
+    'infix': lambda: SimpleMorphemeND('', 'in', at=2, side=Side.AFTER),
+    'suffix': lambda: SimpleMorphemeND('', 'suf', at=-1),
+    'replace': lambda: SimpleMorphemeND('a', 'ä', at=2),
+}
+
+VOWELS = Segmenter(['a', 'e', 'i', 'o', 'u', 'y', 'ei', 'au', 'ou'])
+CHAIN = [SimpleMorphemeND('', 'au', at=2, by=By.VOWELS, side=Side.AFTER), SimpleMorphemeND('', 'n', at=-1, by=By.VOWELS), SimpleMorphemeND('', 'ei', at=1, by=By.VOWELS)]
+
+
+def chain_resegmented(word: str) -> str:
+    '''
+    The chain on a plain string: every step segments the whole word again to find its vowel
+    '''
+    for morpheme in CHAIN:
+        word = str(morpheme(SegmentedWord(word, {By.VOWELS: VOWELS})))
+    return word
+
+
+def chain_segmented(word: SegmentedWord) -> str:
+    for morpheme in CHAIN:
+        word = morpheme(word)
+    return word.text
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per call vs apply_many of SimpleMorphemeND over a word list')
+    parser.add_argument('-n', '--words', type=int, default=1_000_000)
+    parser.add_argument('--chain', type=int, default=100_000, help='words given a chain of morphemes by vowels')
+    args = parser.parse_args()
+
+    words = [grapheme_name(i) for i in range(args.words)]
+    print(f'{args.words} words')
+    for name, make in MORPHEMES.items():
+        morpheme, results = make(), {}
+        per_call = timed(lambda: results.update(per_call=[morpheme(word) for word in words]))
+        batch = timed(lambda: results.update(batch=morpheme.apply_many(words)))
+        streamed = timed(lambda: results.update(streamed=list(morpheme.iter_many(iter(words)))))
+        assert results['per_call'] == results['batch'] == results['streamed']
+        print(f'{name:>8}: {per_call * 1000:9.1f} ms per call, {batch * 1000:8.1f} ms apply_many (x{per_call / batch:.1f}), {streamed * 1000:8.1f} ms iter_many')
+
+    long_words = [f'{word}{"ab" * 10}{word}' for word in words[:args.chain]]
+    segmented_words = [SegmentedWord(word, {By.VOWELS: VOWELS}) for word in long_words]
+    resegmented = timed(lambda: results.update(resegmented=[chain_resegmented(word) for word in long_words]))
+    segmented = timed(lambda: results.update(segmented=[chain_segmented(word) for word in segmented_words]))
+    assert results['resegmented'] == results['segmented']
+    print(f'{len(long_words)} words, {len(CHAIN)} morphemes by vowels: {resegmented * 1000:.1f} ms segmenting every step, {segmented * 1000:.1f} ms as segmented words (x{resegmented / segmented:.1f})')
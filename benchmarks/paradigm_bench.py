@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.snapshot_bench import timed
+from benchmarks.synthetic import grapheme_name
+from src.morphemes import SimpleMorphemeND, Side, Suffix
+
+# a verb paradigm: the endings of the present tense and a stem change at the end of the word
+PARADIGM = {
+    '1sg': lambda: Suffix('e'),
+    '2sg': lambda: Suffix('st'),
+    '3sg': lambda: Suffix('t'),
+    '1pl': lambda: Suffix('en'),
+    'past': lambda: SimpleMorphemeND('', 'te', at=-1, side=Side.AFTER),
+    'stem': lambda: SimpleMorphemeND('a', 'ä', at=-2),
+    'drop': lambda: SimpleMorphemeND('n', '', at=-1),
+}
+
+
+class Inverted(SimpleMorphemeND):
+    '''
+    A morpheme positioned as before: the word is reversed and given to an inverted morpheme made on every call
+    '''
+    is_using_inversion = True
+
+    @classmethod
+    def of(cls, morpheme: SimpleMorphemeND) -> Inverted:
+        return cls(morpheme.to_remove, morpheme.to_insert, at=morpheme.at, by=morpheme.by, side=morpheme.side)
+
+    def __invert__(self) -> SimpleMorphemeND:
+        return SimpleMorphemeND(self.to_remove[::-1], self.to_insert[::-1], at=-self.at, by=self.by, side=-self.side)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inverted vs native right to left positioning over the forms of a suffix paradigm')
+    parser.add_argument('-n', '--words', type=int, default=200_000)
+    args = parser.parse_args()
+
+    stems = [grapheme_name(i) for i in range(args.words)]
+    print(f'{args.words} stems, {len(PARADIGM)} forms')
+    totals = [0.0, 0.0, 0.0]
+    for name, make in PARADIGM.items():
+        new, results = make(), {}
+        old = Inverted.of(new)
+        times = (timed(lambda: results.update(inverted=[old(stem) for stem in stems])),
+                 timed(lambda: results.update(native=[new(stem) for stem in stems])),
+                 timed(lambda: results.update(batch=new.apply_many(stems))))
+        assert results['inverted'] == results['native'] == results['batch']
+        totals = [total + time for total, time in zip(totals, times)]
+        print(f'{name:>5}: {times[0] * 1000:8.1f} ms inverted, {times[1] * 1000:8.1f} ms native (x{times[0] / times[1]:.1f}), {times[2] * 1000:8.1f} ms apply_many')
+    print(f'paradigm: {totals[0] * 1000:8.1f} ms inverted, {totals[1] * 1000:8.1f} ms native (x{totals[0] / totals[1]:.1f}), {totals[2] * 1000:8.1f} ms apply_many')
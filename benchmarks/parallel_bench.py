@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.snapshot_bench import timed
+from benchmarks.synthetic import write_language
+from src.loaders import ParallelYamlLoader, YamlLoader
+
+
+def run(morphemes: int, workers: list[int]) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_language(Path(tmp) / 'synthetic', morphemes)
+        expected = YamlLoader().load(path)
+        results = {'YamlLoader': timed(lambda: YamlLoader().load(path))}
+        for max_workers in workers:
+            loader = ParallelYamlLoader(max_workers=max_workers, chunk_size=max(1 << 16, path.stat().st_size // (4 * max_workers)))
+            results[f'ParallelYamlLoader({max_workers})'] = timed(lambda: loader.load(path))
+            if loader.load(path) != expected:
+                raise AssertionError(f'ParallelYamlLoader({max_workers}) output differs')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serial pure-Python vs parallel libyaml loading')
+    parser.add_argument('-n', '--morphemes', type=int, default=100_000)
+    parser.add_argument('-w', '--workers', type=int, nargs='*', default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+    results = run(args.morphemes, args.workers)
+    print(f'{args.morphemes} morphemes, {os.cpu_count()} cpus')
+    for name, seconds in results.items():
+        print(f'{name:>24}: {seconds * 1000:10.1f} ms   (x{results["YamlLoader"] / seconds:.1f})')
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import operator
+from functools import reduce
+from typing import Any
+
+from benchmarks.snapshot_bench import timed
+from benchmarks.synthetic import SyntheticSpec, generate_language
+from src.constants import LangData
+from src.derivation import Derivation
+from src.rules import Env, Keys, RuleSet, lookup_table
+from src.vectorized import FeatureColumns, VectorizedRuleSet
+
+EXTRA_RULES = {
+    'bound_form': {'when': [{Keys.IS: Keys.MORPHEME}, {LangData.BOUND: True}, {Keys.NOT: LangData.COMPOUND}], 'then': LangData.FORM},
+    'tone_mark': {'when': [{Keys.IS: Keys.MORPHEME}, 'tone'], 'then': {Keys.MATCH: {Keys.FOR: 'tone', Keys.CASES: [
+        {Keys.CASE: 1, Keys.THEN: '\u00AF'}, {Keys.CASE: 2, Keys.THEN: '\u02CA'}, {Keys.CASE: 3, Keys.THEN: '\u02C7'}, {Keys.CASE: 4, Keys.THEN: '\u0060'}, {Keys.THEN: ''},
+    ]}}},
+    'joined_form': {'when': [{Keys.IS: Keys.MORPHEME}, LangData.COMPOUND], 'then': {Keys.ACTION: Keys.REDUCE, Keys.ARGS: ['op.add', 'compound.form']}},
+}
+
+
+def interpret_value(spec: Any, env: Env) -> Any:
+    if isinstance(spec, str):
+        if not spec.startswith(f'{LangData.COMPOUND}.'):
+            return env.get(spec)
+        is_compound = env.derivation is not None and env.derivation.graph.is_compound(env.name)
+        return env.derivation.derive(env.name, spec.split('.', 1)[1]) if is_compound else None
+    if isinstance(spec, dict) and Keys.MATCH in spec:
+        feature, table, default = lookup_table(spec[Keys.MATCH])
+        value = env.get(feature)
+        return table.get(value, default) if value.__hash__ is not None else default
+    if isinstance(spec, dict) and spec.get(Keys.ACTION) == Keys.REDUCE:
+        function, values = getattr(operator, spec[Keys.ARGS][0].split('.', 1)[1]), interpret_value(spec[Keys.ARGS][1], env)
+        return reduce(function, values) if values else None
+    return spec
+
+
+def interpret_condition(condition: Any, env: Env) -> bool:
+    if isinstance(condition, str):
+        return bool(env.get(condition))
+    key, value = next(iter(condition.items()))
+    match key:
+        case Keys.IS: return env.kind == value
+        case Keys.NOT: return env.get(value) is None
+        case _: return env.get(key) == value
+
+
+def interpret(rules: dict, name: str, morpheme: dict, derivation: Derivation) -> dict:
+    '''
+    The baseline: the rule dicts are walked again for every morpheme
+    '''
+    env = Env(name, morpheme, derivation)
+    for feature, specs in rules.items():
+        for spec in (specs if isinstance(specs, list) else [specs]):
+            conditions = spec.get(Keys.WHEN) or []
+            if not all(interpret_condition(condition, env) for condition in (conditions if isinstance(conditions, list) else [conditions])):
+                continue
+            for action in (spec[Keys.THEN] if isinstance(spec[Keys.THEN], list) else [spec[Keys.THEN]]):
+                if isinstance(action, dict) and len(action) == 1 and next(iter(action)) not in Keys.VALUE_KEYS:
+                    target, action = next(iter(action.items()))
+                else:
+                    target = feature
+                env.output(target, interpret_value(action, env))
+    return env.outputs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Interpreted vs compiled when/then rules')
+    parser.add_argument('-n', '--morphemes', type=int, default=100_000)
+    parser.add_argument('--rules', type=int, default=3)
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(args.morphemes, compounds=0.3, depth=3, rules=args.rules, graphemes=26)
+    lang_data = generate_language(spec)
+    morphemes, rules = lang_data[LangData.MORPHEMES], {**lang_data.get(LangData.RULES, {}), **EXTRA_RULES}
+    derivation = Derivation(morphemes, features=spec.features[:spec.rules] + [LangData.FORM])
+    dict(derivation)
+
+    compiling = timed(lambda: RuleSet(rules))
+    rule_set = RuleSet(rules)
+    results = {}
+    interpreted = timed(lambda: results.update(interpreted=[interpret(rules, name, morpheme, derivation) for name, morpheme in morphemes.items()]))
+    compiled = timed(lambda: results.update(compiled=[rule_set.apply(name, morpheme, derivation) for name, morpheme in morphemes.items()]))
+    indexed = timed(lambda: results.update(indexed=rule_set.apply_all(morphemes, derivation)))
+    in_waves = timed(lambda: results.update(in_waves=rule_set.apply_waves(morphemes, derivation)))
+    vectorized_rule_set = VectorizedRuleSet(rules)
+    vectorized = timed(lambda: results.update(vectorized=vectorized_rule_set.apply_all(morphemes, derivation)))
+    columns = vectorized_rule_set.apply_columns(FeatureColumns(morphemes), derivation)
+    columns.outputs.clear()
+    on_columns = timed(lambda: vectorized_rule_set.apply_columns(columns, derivation))
+    assert results['interpreted'] == results['compiled']
+    assert {name: outputs for name, outputs in zip(morphemes, results['compiled']) if outputs} == results['vectorized'] == results['in_waves'] == results['indexed']
+    print(f'{args.morphemes} morphemes, {len(rules)} rules, compiled once in {compiling * 1000:.2f} ms')
+    print(f'{"interpreted":>12}: {interpreted * 1000:10.1f} ms')
+    print(f'{"compiled":>12}: {compiled * 1000:10.1f} ms   (x{interpreted / compiled:.1f})')
+    print(f'{"indexed":>12}: {indexed * 1000:10.1f} ms   (x{interpreted / indexed:.1f}), every rule on its candidates only')
+    print(f'{"in waves":>12}: {in_waves * 1000:10.1f} ms   (x{interpreted / in_waves:.1f}), waves {rule_set.waves}')
+    print(f'{"vectorized":>12}: {vectorized * 1000:10.1f} ms   (x{interpreted / vectorized:.1f}), {sum(vectorized_rule_set.vectorized)} rules on columns')
+    print(f'{"on columns":>12}: {on_columns * 1000:10.1f} ms   (x{interpreted / on_columns:.1f}), with the feature columns already built')
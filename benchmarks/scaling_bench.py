@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.synthetic import SyntheticSpec, write_language
+from src.constants import LangData
+from src.derivation import Derivation
+from src.lang_factory import LangFactory
+from src.language import Language
+from src.morphemes import SimpleMorphemeND
+from src.schema_validator import SchemaValidator
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def derive_naive(language: Language, features: list[str]) -> dict[str, dict]:
+    '''
+    The baseline derivation: every compound resolves its components recursively, nothing is shared between compounds
+    '''
+    morphemes = language.morphemes
+
+    def resolve(name: str) -> dict:
+        morpheme = morphemes[name]
+        if LangData.COMPOUND not in morpheme:
+            return morpheme
+        components = [resolve(component) for component in morpheme[LangData.COMPOUND]]
+        derived = {LangData.FORM: ''.join(component[LangData.FORM] for component in components)}
+        derived.update({feature: [component.get(feature) for component in components] for feature in features})
+        return derived
+
+    return {name: resolve(name) for name, morpheme in morphemes.items() if LangData.COMPOUND in morpheme}
+
+
+def apply(language: Language) -> int:
+    prefix, suffix = SimpleMorphemeND('', 'pre', at=1), SimpleMorphemeND('', 'suf', at=-1)
+    count = 0
+    for morpheme in language.morphemes.values():
+        if LangData.FORM in morpheme:
+            prefix(suffix(morpheme[LangData.FORM]))
+            count += 1
+    return count
+
+
+def run_stages(path: Path, spec: SyntheticSpec) -> dict[str, tuple[float, float]]:
+    '''
+    Returns the seconds and the peak RSS growth in MiB over the interpreter start of every stage
+    '''
+    baseline, results, context = peak_rss_mb(), {}, {}
+
+    def stage(name: str, fn: Callable) -> None:
+        start = time.perf_counter()
+        context[name] = fn()
+        results[name] = time.perf_counter() - start, peak_rss_mb() - baseline
+
+    validator = SchemaValidator()
+    stage('load', lambda: LangFactory(path.parent, path.name).load())
+    stage('validate', lambda: validator.check({LangData.MORPHEMES: context['load'].morphemes}))
+    stage('naive', lambda: derive_naive(context['load'], spec.features[:spec.rules]))
+    stage('derive', lambda: dict(Derivation(context['load'])))
+    stage('apply', lambda: apply(context['load']))
+    return results
+
+
+def in_child(*args: str) -> str:
+    # every size runs in its own process, so the peak RSS of a size is not inherited by the next one
+    return subprocess.run([sys.executable, '-m', 'benchmarks.scaling_bench', *args], capture_output=True, text=True, check=True).stdout
+
+
+if __name__ == '__main__':
+    defaults = SyntheticSpec(compounds=0.3, depth=3, fan_out=2, rules=2, graphemes=26)
+    parser = argparse.ArgumentParser(description='Throughput and memory of load, validate, derive and apply on synthetic languages')
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', default=SIZES)
+    for spec_field in fields(SyntheticSpec):
+        if spec_field.name != 'morphemes':
+            parser.add_argument(f'--{spec_field.name.replace("_", "-")}', type=type(getattr(defaults, spec_field.name)), default=getattr(defaults, spec_field.name))
+    parser.add_argument('--child', metavar='SPEC', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        spec = SyntheticSpec(**json.loads(args.child))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_language(Path(tmp) / 'synthetic', **asdict(spec))
+            print(json.dumps(run_stages(path, spec)))
+        sys.exit()
+
+    options = {spec_field.name: getattr(args, spec_field.name) for spec_field in fields(SyntheticSpec) if spec_field.name != 'morphemes'}
+    print(', '.join(f'{name}={value}' for name, value in options.items()))
+    print(f'{"morphemes":>10} {"stage":>9} {"time":>10} {"morphemes/s":>13} {"peak RSS":>10}')
+    for size in args.sizes:
+        results = json.loads(in_child('--child', json.dumps({'morphemes': size, **options})))
+        for stage, (seconds, rss) in results.items():
+            print(f'{size:>10} {stage:>9} {seconds * 1000:8.1f}ms {size / seconds:13.0f} {rss:7.1f}MiB')
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import random
+
+from benchmarks.snapshot_bench import timed
+from src.segmentation import SegmentationCache, Segmenter
+
+GRAPHEMES = ['a', 'ä', 'b', 'c', 'ch', 'ck', 'd', 'dż', 'e', 'ei', 'eu', 'f', 'g', 'h', 'i', 'ie', 'k', 'l', 'm', 'n', 'ng', 'o', 'ö', 'p', 'r', 's', 'sch', 'sz', 't', 'u', 'ü', 'w', 'z']
+
+
+def word_to_basics_linear(word: str, basics: list[str]) -> list[str]:
+    '''
+    The former segmentation: the basics are sorted on every call and scanned for the first one sharing the first letter
+    '''
+    basics, segments = sorted(basics, reverse=True), []
+    while word:
+        starting = next(filter(lambda basic: basic.startswith(word[0]), basics), None)
+        segments.append(starting if starting is not None else word[0])
+        word = word[len(starting) if starting is not None else 1:]
+    return segments
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Linear scan vs trie segmentation of a lexicon')
+    parser.add_argument('-n', '--words', type=int, default=100_000)
+    parser.add_argument('--passes', type=int, default=4, help='times every word is segmented again, as by several morphemes')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = [''.join(rng.choices(GRAPHEMES, k=rng.randint(2, 8))) for _ in range(args.words)]
+    linear = timed(lambda: [word_to_basics_linear(word, GRAPHEMES) for word in words])
+    compiling = timed(lambda: Segmenter(GRAPHEMES))
+    segmenter = Segmenter(GRAPHEMES)
+    trie = timed(lambda: segmenter.segment_many(words))
+    repeated = words * args.passes
+    # the segments are used and dropped, as by a morpheme, not kept for the whole run
+    uncached = timed(lambda: sum(len(list(segmenter.segment(word))) for word in repeated))
+    cache = SegmentationCache(segmenter, maxsize=args.words)
+    cached = timed(lambda: sum(len(list(cache.segment(word))) for word in repeated))
+    print(f'{args.words} words, {len(GRAPHEMES)} graphemes, trie compiled in {compiling * 1000:.2f} ms')
+    print(f'{"linear":>8}: {linear * 1000:9.1f} ms')
+    print(f'{"trie":>8}: {trie * 1000:9.1f} ms   (x{linear / trie:.1f})')
+    print(f'{args.passes} passes over the words:')
+    print(f'{"uncached":>8}: {uncached * 1000:9.1f} ms')
+    print(f'{"cached":>8}: {cached * 1000:9.1f} ms   (x{uncached / cached:.1f}), {cache.info()}')
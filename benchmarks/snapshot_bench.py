@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_language
+from src.lang_factory import LangFactory
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(morphemes: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        languages, cache = Path(tmp) / 'languages', Path(tmp) / 'cache'
+        write_language(languages / 'synthetic', morphemes)
+        uncached = timed(lambda: LangFactory(languages, 'synthetic').load())
+        cold = timed(lambda: LangFactory(languages, 'synthetic', cache_path=cache).load())
+        warm = timed(lambda: LangFactory(languages, 'synthetic', cache_path=cache).load())
+        (languages / 'synthetic' / 'general.yaml').write_text('native-name: changed\n')
+        partial = timed(lambda: LangFactory(languages, 'synthetic', cache_path=cache).load())
+    return {'uncached': uncached, 'cold': cold, 'warm': warm, 'general.yaml changed': partial}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold vs warm LangFactory.load with the snapshot cache')
+    parser.add_argument('-n', '--morphemes', type=int, default=100_000)
+    args = parser.parse_args()
+    results = run(args.morphemes)
+    print(f'{args.morphemes} morphemes')
+    for name, seconds in results.items():
+        print(f'{name:>22}: {seconds * 1000:10.1f} ms   (x{results["uncached"] / seconds:.1f})')
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+
+from benchmarks.synthetic import write_language
+from src.loaders import YamlFileLoader
+
+MODES = {
+    'safe_load': lambda path: YamlFileLoader().load(path),
+    'iter_items': lambda path: deque(YamlFileLoader().iter_items(path), maxlen=0),
+    'safe_load, kept': lambda path: dict(YamlFileLoader().load(path)),
+    'iter_items, kept': lambda path: dict(YamlFileLoader().iter_items(path)),
+}
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def in_child(*args: str) -> str:
+    # linux keeps ru_maxrss over execve, so the parent stays small by generating the lexicon in a child as well
+    return subprocess.run([sys.executable, '-m', 'benchmarks.stream_bench', *args], capture_output=True, text=True, check=True).stdout
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Peak RSS of whole-document vs streamed morphemes.yaml parsing')
+    parser.add_argument('-n', '--morphemes', type=int, default=100_000)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    parser.add_argument('--generate', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.generate:
+        write_language(args.generate, args.morphemes)
+        sys.exit()
+    if args.child:
+        mode, path = args.child
+        baseline = peak_rss_mb()
+        MODES[mode](Path(path))
+        print(peak_rss_mb() - baseline)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_child('-n', str(args.morphemes), '--generate', tmp)
+        path = Path(tmp) / 'morphemes.yaml'
+        print(f'{args.morphemes} morphemes, {path.stat().st_size / 2**20:.1f} MiB of yaml, peak RSS above interpreter start')
+        for mode in MODES:
+            print(f'{mode:>18}: {float(in_child("--child", mode, str(path))):8.1f} MiB')
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+import string
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+from src.constants import LangData
+
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    '''
+    The shape of a synthetic language. Compounds are spread evenly over the levels 1..depth and every compound has
+    fan_out components, at least one of them from the level right below. Each rule derives one feature of a compound
+    from its components. Without graphemes a morpheme's form is its name
+    '''
+    morphemes: int = 1000
+    compounds: float = 0.0
+    depth: int = 1
+    fan_out: int = 2
+    rules: int = 0
+    graphemes: int = 0
+    seed: int = 0
+
+    @property
+    def features(self) -> list[str]:
+        return ['tone', *(f'feature{i}' for i in range(1, self.rules))]
+
+
+def morpheme_name(i: int) -> str:
+    return f'm{i}'
+
+
+def grapheme_name(i: int) -> str:
+    letters = string.ascii_lowercase
+    name = letters[i % len(letters)]
+    while i := i // len(letters):
+        name = letters[(i - 1) % len(letters)] + name
+    return name
+
+
+def generate_morphemes(n: int) -> dict:
+    return {morpheme_name(i): {'form': morpheme_name(i), 'tone': i % 5, 'bound': i % 3 == 0} for i in range(n)}
+
+
+def generate_graphemes(n: int) -> dict:
+    return {'latin': {'list': [grapheme_name(i) for i in range(n)]}} if n else {}
+
+
+def generate_rules(spec: SyntheticSpec) -> dict:
+    return {feature: {
+        'when': [{'is': 'morpheme'}, {'not': feature}, LangData.COMPOUND],
+        'then': f'{LangData.COMPOUND}.{feature}',
+    } for feature in spec.features[:spec.rules]}
+
+
+def generate_lexicon(spec: SyntheticSpec) -> dict:
+    rng = random.Random(spec.seed)
+    compounds = int(spec.morphemes * spec.compounds) if spec.depth else 0
+    simple = spec.morphemes - compounds
+    inventory = [grapheme_name(i) for i in range(spec.graphemes)]
+
+    morphemes = generate_morphemes(simple)
+    for i, morpheme in enumerate(morphemes.values()):
+        if inventory:
+            morpheme[LangData.FORM] = ''.join(rng.choices(inventory, k=rng.randint(1, 3)))
+        for feature in spec.features[1:spec.rules]:
+            morpheme[feature] = rng.randrange(5)
+
+    levels, start = [range(simple)], simple
+    for level in range(spec.depth):
+        end = simple + compounds * (level + 1) // spec.depth
+        lower = range(0, start)
+        below = levels[-1] or lower
+        for i in range(start, end):
+            components = [rng.choice(below)] + [rng.choice(lower) for _ in range(spec.fan_out - 1)]
+            morphemes[morpheme_name(i)] = {LangData.COMPOUND: list(map(morpheme_name, components))}
+        levels.append(range(start, end))
+        start = end
+    return morphemes
+
+
+def generate_language(spec: SyntheticSpec, name: str = 'synthetic') -> dict:
+    lang_data = {
+        LangData.GENERAL: {'native-name': name},
+        LangData.GRAPHEMES: generate_graphemes(spec.graphemes),
+        LangData.MORPHEMES: generate_lexicon(spec),
+        LangData.RULES: generate_rules(spec),
+    }
+    return {section: data for section, data in lang_data.items() if data}
+
+
+def write_language(path: str | Path, morphemes: int = 1000, **spec) -> Path:
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for section, data in generate_language(SyntheticSpec(morphemes, **spec), path.name).items():
+        with open(path / f'{section}.yaml', 'w') as f:
+            yaml.dump(data, f, Dumper=Dumper, allow_unicode=True, sort_keys=False)
+    return path
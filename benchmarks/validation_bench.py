@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import argparse
+
+import strictyaml
+import yaml
+
+from benchmarks.snapshot_bench import timed
+from benchmarks.synthetic import generate_morphemes
+from src.constants import LangData
+from src.schema_validator import SchemaValidator, morphemes_schema
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='strictyaml schema vs the compiled dict-level SchemaValidator')
+    parser.add_argument('-n', '--morphemes', type=int, default=1_000)
+    args = parser.parse_args()
+
+    morphemes = generate_morphemes(args.morphemes)
+    text = yaml.safe_dump(morphemes, allow_unicode=True, sort_keys=False)
+    validator = SchemaValidator()
+    lang_data = {LangData.MORPHEMES: morphemes}
+
+    strict = timed(lambda: strictyaml.load(text, morphemes_schema))
+    compiled = timed(lambda: validator.check(lang_data))
+    print(f'{args.morphemes} morphemes')
+    print(f'{"strictyaml":>16}: {strict * 1000:10.1f} ms')
+    print(f'{"SchemaValidator":>16}: {compiled * 1000:10.1f} ms   (x{strict / compiled:.0f})')
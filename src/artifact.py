@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from src.constants import LangData
+from src.exceptions import InvalidPathException, InvalidYamlException, Messages
+from src.language import Language
+from src.utils import lazy_import
+
+yaml = lazy_import('yaml')
+
+
+class ValueType:
+    STR = 0
+    INT = 1
+    BOOL = 2
+    FLOAT = 3
+    YAML = 4
+
+
+class Sections:
+    STRINGS = 0
+    STRING_OFFSETS = 1
+    NAMES = 2
+    FORMS = 3
+    FEATURE_OFFSETS = 4
+    FEATURE_NAMES = 5
+    FEATURE_VALUES = 6
+    FEATURE_TYPES = 7
+    COMPOUND_OFFSETS = 8
+    COMPOUND_TARGETS = 9
+
+    ALL = range(10)
+    UINT8 = (STRINGS, FEATURE_TYPES)
+
+
+class LanguageArtifact(Mapping):
+    '''
+    A compiled, read-only lexicon meant to be mmapped: every string lives once in a string table and the morphemes are
+    flat arrays of ids into it, with the features and the compound edges stored as offset arrays. Nothing is
+    deserialized on opening, so processes opening the same file share one physical copy of it.
+    Arrays are written in the native byte order. A compound component that is not a morpheme of the lexicon is kept as
+    its string id marked with the UNRESOLVED bit
+    '''
+    MAGIC = b'LANGART1'
+    NONE = 0xFFFFFFFF
+    UNRESOLVED = 0x80000000
+    _header = struct.Struct(f'<8sBI{2 * len(Sections.ALL)}Q')
+    _byteorders = {'little': 1, 'big': 2}
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, name_id, *bounds = self._header.unpack_from(self._mmap)
+        if magic != self.MAGIC or byteorder != self._byteorders[sys.byteorder]:
+            self._mmap.close()
+            raise InvalidPathException(f'{self.path} is not a language artifact for this platform')
+        self._view = view = memoryview(self._mmap)
+        self._sections: list[memoryview] = []
+        for section in Sections.ALL:
+            start, end = bounds[2 * section: 2 * section + 2]
+            self._sections.append(view[start:end] if section in Sections.UINT8 else view[start:end].cast('I'))
+        self._strings, self._string_offsets, self._names, self._forms = self._sections[:4]
+        self.name: str = self.string(name_id)
+
+    @classmethod
+    def open(cls, path: str | Path) -> LanguageArtifact:
+        return cls(path)
+
+    def close(self) -> None:
+        for section in self._sections:
+            section.release()
+        self._sections = []
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> LanguageArtifact:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == self.NONE:
+            return None
+        return str(self._strings[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], 'utf-8')
+
+    def _raw_string(self, string_id: int) -> bytes:
+        return self._strings[self._string_offsets[string_id]:self._string_offsets[string_id + 1]].tobytes()
+
+    def index(self, name: str) -> int:
+        target, low, high = name.encode('utf-8'), 0, len(self._names)
+        while low < high:
+            middle = (low + high) // 2
+            if self._raw_string(self._names[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self._names) or self._raw_string(self._names[low]) != target:
+            raise KeyError(name)
+        return low
+
+    def morpheme_name(self, index: int) -> str:
+        return self.string(self._names[index])
+
+    def form(self, index: int) -> Optional[str]:
+        return self.string(self._forms[index])
+
+    def features(self, index: int) -> dict[str, Any]:
+        offsets, names, values, types = self._sections[Sections.FEATURE_OFFSETS:Sections.FEATURE_TYPES + 1]
+        return {self.string(names[i]): self._decode(self.string(values[i]), types[i]) for i in range(offsets[index], offsets[index + 1])}
+
+    def compound(self, index: int) -> Optional[list[int]]:
+        offsets, targets = self._sections[Sections.COMPOUND_OFFSETS:Sections.COMPOUND_TARGETS + 1]
+        if offsets[index] == offsets[index + 1]:
+            return None
+        return list(targets[offsets[index]:offsets[index + 1]])
+
+    def __getitem__(self, name: str) -> dict[str, Any]:
+        index = self.index(name)
+        morpheme = {}
+        if (form := self.form(index)) is not None:
+            morpheme[LangData.FORM] = form
+        morpheme.update(self.features(index))
+        if (compound := self.compound(index)) is not None:
+            morpheme[LangData.COMPOUND] = list(map(self._component_name, compound))
+        return morpheme
+
+    def _component_name(self, target: int) -> str:
+        return self.string(target & ~self.UNRESOLVED) if target & self.UNRESOLVED else self.morpheme_name(target)
+
+    def __contains__(self, name: object) -> bool:
+        try:
+            self.index(name)
+        except (KeyError, AttributeError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.morpheme_name(i) for i in range(len(self._names)))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _decode(value: str, value_type: int) -> Any:
+        match value_type:
+            case ValueType.STR: return value
+            case ValueType.INT: return int(value)
+            case ValueType.BOOL: return value == 'True'
+            case ValueType.FLOAT: return float(value)
+            case _: return yaml.safe_load(value)
+
+    @staticmethod
+    def _encode(value: Any) -> tuple[str, int]:
+        match value:
+            case str(): return value, ValueType.STR
+            case bool(): return str(value), ValueType.BOOL
+            case int(): return str(value), ValueType.INT
+            case float(): return repr(value), ValueType.FLOAT
+            case _: return yaml.safe_dump(value, allow_unicode=True), ValueType.YAML
+
+    @classmethod
+    def compile(cls, language: Language | Mapping, path: str | Path, name: str = None) -> Path:
+        '''
+        Writes the morphemes of a language, or of a name -> entry mapping, into an artifact at path. Names, forms, feature
+        names and compound components are looked up as strings, any other type is an InvalidYamlException
+        '''
+        morphemes: Mapping = language.morphemes if isinstance(language, Language) else language
+        name = name if name is not None else language.name if isinstance(language, Language) else Path(path).stem
+        strings: dict[str, int] = {}
+        intern = lambda string: strings.setdefault(string, len(strings))
+
+        ordered = sorted(morphemes, key=lambda morpheme: str(morpheme).encode('utf-8'))
+        positions = {morpheme: i for i, morpheme in enumerate(ordered)}
+        arrays = {section: array('B' if section in Sections.UINT8 else 'I') for section in Sections.ALL}
+        arrays[Sections.FEATURE_OFFSETS].append(0)
+        arrays[Sections.COMPOUND_OFFSETS].append(0)
+        name_id = intern(name)
+        for morpheme_name in ordered:
+            morpheme = morphemes[morpheme_name] or {}
+            path_of = f'{morpheme_name} > '
+            arrays[Sections.NAMES].append(intern(cls._text(morpheme_name, path_of, 'A morpheme name')))
+            form = morpheme.get(LangData.FORM)
+            arrays[Sections.FORMS].append(intern(cls._text(form, path_of, LangData.FORM)) if form is not None else cls.NONE)
+            for feature, value in morpheme.items():
+                if feature in LangData.FORMING_KEYS:
+                    continue
+                encoded, value_type = cls._encode(value)
+                arrays[Sections.FEATURE_NAMES].append(intern(cls._text(feature, path_of, 'A feature name')))
+                arrays[Sections.FEATURE_VALUES].append(intern(encoded))
+                arrays[Sections.FEATURE_TYPES].append(value_type)
+            arrays[Sections.FEATURE_OFFSETS].append(len(arrays[Sections.FEATURE_NAMES]))
+            for component in morpheme.get(LangData.COMPOUND) or []:
+                target = positions[component] if component in positions else cls.UNRESOLVED | intern(cls._text(component, path_of, LangData.COMPOUND))
+                arrays[Sections.COMPOUND_TARGETS].append(target)
+            arrays[Sections.COMPOUND_OFFSETS].append(len(arrays[Sections.COMPOUND_TARGETS]))
+
+        encoded_strings = [string.encode('utf-8') for string in strings]
+        arrays[Sections.STRINGS] = array('B', b''.join(encoded_strings))
+        arrays[Sections.STRING_OFFSETS].append(0)
+        for encoded in encoded_strings:
+            arrays[Sections.STRING_OFFSETS].append(arrays[Sections.STRING_OFFSETS][-1] + len(encoded))
+        return cls._write(Path(path), name_id, arrays)
+
+    @staticmethod
+    def _text(value: Any, path: str, what: str) -> str:
+        if not isinstance(value, str):
+            raise InvalidYamlException(path, Messages.WRONG_TYPE % (what, 'a string'))
+        return value
+
+    @classmethod
+    def _write(cls, path: Path, name_id: int, arrays: dict[int, array]) -> Path:
+        bounds, body, position = [], bytearray(), cls._header.size
+        for section in Sections.ALL:
+            padding = -position % 4
+            body += bytes(padding)
+            position += padding
+            data = arrays[section].tobytes()
+            bounds += [position, position + len(data)]
+            body += data
+            position += len(data)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(cls._header.pack(cls.MAGIC, cls._byteorders[sys.byteorder], name_id, *bounds))
+            f.write(body)
+        tmp_path.replace(path)
+        return path
@@ -17,6 +17,7 @@ class LangData:
     GRAPHEMES = 'graphemes'
     FORM = 'form'
     COMPOUND = 'compound'
+    BOUND = 'bound'
 
     FORMING_KEYS = (FORM, COMPOUND)
 
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator
+
+from src.constants import LangData
+from src.exceptions import InvalidYamlException, Messages
+from src.language import Language
+from src.loaders import LangDataDiff
+
+_VISITING, _DONE = 1, 2
+_MISSING = object()
+
+
+class CompoundGraph:
+    '''
+    The reference graph of the compound morphemes of a lexicon. It is built and checked once, order lists every compound
+    after all of its components and dependents is the reverse index from a morpheme to the compounds using it directly
+    '''
+    def __init__(self, morphemes: Mapping[str, dict]):
+        self.morphemes = morphemes
+        self.components: dict[str, list[str]] = {}
+        self.dependents: dict[str, set[str]] = defaultdict(set)
+        for name in morphemes:
+            self._link(name)
+        self._sort()
+
+    def _components_of(self, name: str) -> list[str]:
+        morpheme = self.morphemes.get(name)
+        return list(morpheme[LangData.COMPOUND]) if isinstance(morpheme, dict) and morpheme.get(LangData.COMPOUND) else []
+
+    def _link(self, name: str) -> None:
+        for component in self.components.pop(name, ()):
+            self.dependents[component].discard(name)
+        if components := self._components_of(name):
+            self.components[name] = components
+            for component in components:
+                self.dependents[component].add(name)
+
+    def _sort(self) -> None:
+        self.order: list[str] = self._topological_order()
+        self._positions: dict[str, int] = {name: i for i, name in enumerate(self.order)}
+
+    def update(self, names: Iterable[str]) -> None:
+        '''
+        Follows the changes of the given morphemes, the order is only recomputed when their components changed
+        '''
+        relinked = False
+        for name in names:
+            if self.components.get(name, []) != self._components_of(name):
+                self._link(name)
+                relinked = True
+        if relinked:
+            self._sort()
+
+    def affected_by(self, names: Iterable[str]) -> list[str]:
+        '''
+        The compounds among names and their transitive dependents, in order
+        '''
+        seen, pending = set(), list(names)
+        while pending:
+            name = pending.pop()
+            if name not in seen:
+                seen.add(name)
+                pending.extend(self.dependents.get(name, ()))
+        return sorted(seen & self._positions.keys(), key=self._positions.__getitem__)
+
+    def _topological_order(self) -> list[str]:
+        order, states = [], {}
+        for root in self.components:
+            if root in states:
+                continue
+            states[root] = _VISITING
+            stack = [(root, iter(self.components[root]))]
+            while stack:
+                name, pending = stack[-1]
+                for component in pending:
+                    if component not in self.morphemes:
+                        raise InvalidYamlException(f'{name} > {LangData.COMPOUND} > ', Messages.NOT_DEFINED % component)
+                    if component not in self.components or states.get(component) == _DONE:
+                        continue
+                    if states.get(component) == _VISITING:
+                        cycle = [visited for visited, _ in stack]
+                        cycle = cycle[cycle.index(component):] + [component]
+                        raise InvalidYamlException(f'{component} > ', Messages.COMPOUND_CYCLE % ' > '.join(cycle))
+                    states[component] = _VISITING
+                    stack.append((component, iter(self.components[component])))
+                    break
+                else:
+                    stack.pop()
+                    states[name] = _DONE
+                    order.append(name)
+        return order
+
+    def is_compound(self, name: str) -> bool:
+        return name in self.components
+
+
+def derived_features(rules: Mapping) -> list[str]:
+    '''
+    The features the rules take from the components, i.e. the ones with "then: compound.<feature>"
+    '''
+    prefix, features = f'{LangData.COMPOUND}.', [LangData.FORM]
+    for rule in rules.values():
+        for then in (rule if isinstance(rule, list) else [rule]):
+            then = then.get('then') if isinstance(then, dict) else None
+            if isinstance(then, str) and then.startswith(prefix) and then[len(prefix):] not in features:
+                features.append(then[len(prefix):])
+    return features
+
+
+class Derivation:
+    '''
+    Derives the features of compounds from their components. Every derived value is memoized per feature and morpheme,
+    so a sub-compound shared by many compounds is derived once. A feature defined on a compound itself is kept
+    '''
+    def __init__(self, language: Language | Mapping[str, dict], features: Iterable[str] = None):
+        morphemes = language.morphemes if isinstance(language, Language) else language
+        if features is None:
+            features = derived_features(language.rules) if isinstance(language, Language) else [LangData.FORM]
+        self.graph = CompoundGraph(morphemes)
+        self.features: list[str] = list(features)
+        self._derived: dict[str, dict[str, Any]] = {feature: {} for feature in self.features}
+
+    @property
+    def morphemes(self) -> Mapping[str, dict]:
+        return self.graph.morphemes
+
+    def derive(self, name: str, feature: str) -> Any:
+        morpheme = self.morphemes[name]
+        if not self.graph.is_compound(name) or feature in morpheme:
+            return morpheme.get(feature)
+        derived = self._derived.setdefault(feature, {})
+        if name not in derived:
+            derived[name] = self._combine(feature, [self.derive(component, feature) for component in self.graph.components[name]])
+        return derived[name]
+
+    def derive_all(self, feature: str = LangData.FORM) -> dict[str, Any]:
+        '''
+        Derives the feature of every compound, components first, so nothing is derived twice and nothing recurses
+        '''
+        return {name: self.derive(name, feature) for name in self.graph.order}
+
+    def update(self, changed: Iterable[str] | LangDataDiff) -> dict[str, dict[str, Any]]:
+        '''
+        Re-derives only the morphemes depending on the changed ones, the lexicon itself has to be updated already.
+        Returns the new values of the derived features that changed, a compound which is gone gets None. A feature
+        never derived for an existing compound is left to be derived when asked for, it cannot be told to have changed
+        '''
+        if isinstance(changed, LangDataDiff):
+            changed = {name for part in (changed.added, changed.removed, changed.changed) for name in part.get(LangData.MORPHEMES, {})}
+        changed = set(changed)
+        stale = self.graph.affected_by(changed) + [name for name in changed if name in self.graph.components]
+        new = {name for name in changed if not self.graph.is_compound(name)}
+        self.graph.update(changed)
+        previous = {feature: {name: derived.pop(name) for name in stale if name in derived} for feature, derived in self._derived.items()}
+
+        changes: dict[str, dict[str, Any]] = defaultdict(dict)
+        for name in self.graph.affected_by(changed):
+            for feature in self.features:
+                old = previous[feature].get(name, _MISSING)
+                if old is _MISSING and (name not in new or feature in self.morphemes[name]):
+                    continue
+                if (value := self.derive(name, feature)) != old:
+                    changes[name][feature] = value
+        for feature, values in previous.items():
+            for name in values.keys() - self.graph.components.keys():
+                changes[name][feature] = None
+        return dict(changes)
+
+    def __iter__(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        for name in self.graph.order:
+            yield name, {feature: self.derive(name, feature) for feature in self.features}
+
+    def _combine(self, feature: str, values: list[Any]) -> Any:
+        if feature == LangData.FORM:
+            return ''.join(str(value) for value in values if value is not None)
+        combined = []
+        for value in values:
+            combined.extend(value if isinstance(value, list) else [value])
+        return combined
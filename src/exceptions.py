@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import Iterable
 
 from src.constants import LangData
 
@@ -8,8 +11,9 @@ class InvalidPathException(Exception):
 
 
 class InvalidYamlException(Exception):
-    def __init__(self, *args: str):
+    def __init__(self, *args: str, errors: Iterable[InvalidYamlException] = ()):
         self.args = args or tuple()
+        self.errors: list[InvalidYamlException] = list(errors)
 
     @property
     def reason(self) -> str:
@@ -22,3 +26,10 @@ class Messages:
     NO_FORMING_KEY = f'One of the following keys must appear: {LangData.FORMING_KEYS}'
     LACK_OF_REQUIRED_FIELD = '%s has no required %s field'
     NOT_DEFINED = '%s is not defined'
+    NOT_A_MAPPING = 'The top level has to be a mapping'
+    WRONG_TYPE = '%s has to be %s'
+    UNKNOWN_CONDITION = 'Unknown condition: %s'
+    UNKNOWN_ACTION = 'Unknown action: %s'
+    INVALID_PYTHON = 'Invalid python: %s'
+    RULE_CYCLE = 'Rules depend on each other: %s'
+    COMPOUND_CYCLE = 'A compound cannot consist of itself: %s'
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterator, Optional
+
+
+class Column:
+    '''
+    One feature of every element: a typed array of values and a bitmap of the elements having one. Text is kept as ids
+    into the string pool of the table. A column getting a value of another type falls back to a plain list
+    '''
+    __slots__ = ('kind', 'values', 'present')
+
+    _typecodes = {bool: 'b', int: 'q', float: 'd', str: 'I'}
+
+    def __init__(self, kind: type):
+        self.kind: type = kind
+        self.values: array | list = array(self._typecodes[kind]) if kind in self._typecodes else []
+        self.present = bytearray()
+
+    def grow(self, size: int) -> None:
+        if (missing := size - len(self.present)) > 0:
+            self.present.extend(bytes(missing))
+            self.values.extend([0] * missing if isinstance(self.values, array) else [None] * missing)
+
+    def nbytes(self) -> int:
+        values = self.values.itemsize * len(self.values) if isinstance(self.values, array) else 8 * len(self.values)
+        return values + len(self.present)
+
+
+class FeatureTable:
+    '''
+    The features of all the elements of a language stored as columns, element ids are the rows and the feature names are
+    interned into column ids. Elements only keep their row
+    '''
+    def __init__(self):
+        self.feature_ids: dict[str, int] = {}
+        self.columns: list[Column] = []
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add_row(self, features: dict[str, Any] = None) -> int:
+        row, self.size = self.size, self.size + 1
+        for feature, value in (features or {}).items():
+            self.set(row, feature, value)
+        return row
+
+    def intern(self, string: str) -> int:
+        if (string_id := self._string_ids.get(string)) is None:
+            string_id = self._string_ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def column(self, feature: str) -> Optional[Column]:
+        feature_id = self.feature_ids.get(feature)
+        return self.columns[feature_id] if feature_id is not None else None
+
+    def get(self, row: int, feature: str, default: Any = None) -> Any:
+        column = self.column(feature)
+        if column is None or row >= len(column.present) or not column.present[row]:
+            return default
+        value = column.values[row]
+        if column.kind is str:
+            return self.strings[value]
+        return column.kind(value) if column.kind is bool else value
+
+    def set(self, row: int, feature: str, value: Any) -> None:
+        if (feature_id := self.feature_ids.get(feature)) is None:
+            feature_id = self.feature_ids[feature] = len(self.columns)
+            self.columns.append(Column(type(value)))
+        column = self.columns[feature_id]
+        if value is None:
+            if row < len(column.present):
+                column.present[row] = 0
+            return
+        if type(value) is not column.kind and isinstance(column.values, array):
+            self._to_list(column)
+        column.grow(max(row + 1, self.size))
+        column.values[row] = self.intern(value) if column.kind is str and isinstance(column.values, array) else value
+        column.present[row] = 1
+
+    def _to_list(self, column: Column) -> None:
+        values = [self.strings[value] if column.kind is str else column.kind(value) for value in column.values]
+        column.values, column.kind = [value if present else None for value, present in zip(values, column.present)], object
+
+    def row(self, row: int) -> dict[str, Any]:
+        return {feature: value for feature in self.feature_ids if (value := self.get(row, feature)) is not None}
+
+    def values(self, feature: str) -> list[Any]:
+        '''
+        The whole column of a feature, None for the rows without a value
+        '''
+        column = self.column(feature)
+        if column is None:
+            return [None] * self.size
+        decode = self.strings.__getitem__ if column.kind is str and isinstance(column.values, array) else bool if column.kind is bool else None
+        values = [(decode(value) if decode is not None else value) if present else None for value, present in zip(column.values, column.present)]
+        return values + [None] * (self.size - len(values))
+
+    def rows(self, feature: str) -> Iterator[int]:
+        column = self.column(feature)
+        return (row for row, present in enumerate(column.present) if present) if column is not None else iter(())
+
+    def nbytes(self) -> int:
+        '''
+        The size of the columns and of the string pool, without the Python object overhead of the pool
+        '''
+        return sum(column.nbytes() for column in self.columns) + sum(len(string.encode('utf-8')) for string in self.strings)
@@ -1,45 +1,126 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from src.constants import LangData
 from src.language import Language
-from src.loaders import ILoader, IPath, LangDataLoader
+from src.loaders import ILoader, IPath, IncrementalYamlLoader, LangDataDiff, LangDataLoader, YamlFileLoader
+from src.rules import RuleSet
+from src.schema_validator import SchemaValidator
+from src.snapshot import CachedYamlLoader
+from src.utils import lazy_import
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+futures = lazy_import('concurrent.futures')
 
 
 class LangaugeInterpreter:
+    _containers = {
+        LangData.GENERAL: 'general',
+        LangData.FEATURES: 'features',
+        LangData.GRAPHEMES: 'graphemes',
+        LangData.MORPHEMES: 'morphemes',
+        LangData.RULES: 'rules',
+    }
+
     def __init__(self):
         self._language = None
 
-    def create(self, name: str, data: dict):
+    def create(self, name: str, data: dict) -> Language:
         self._language = Language(name)
-        self._interpret_orthography(data.get(LangData.ORTHOGRAPHY))
-        self._interpret_morphology(data.get(LangData.MORPHOLOGY))
+        self._interpret_general(data.get(LangData.GENERAL) or {})
+        self._interpret_orthography(data.get(LangData.GRAPHEMES) or {})
+        self._interpret_morphology(data)
+        return self._language
+
+    def update(self, language: Language, diff: LangDataDiff) -> Language:
+        self._language = language
+        for section in diff.sections & self._containers.keys():
+            self._forget(section, diff.removed.get(section, {}).keys() | diff.changed.get(section, {}).keys())
+            self._interpret_section(section, {**diff.added.get(section, {}), **diff.changed.get(section, {})})
+        return self._language
+
+    def _interpret_section(self, section: str, entries: dict) -> None:
+        entries = {key: entry for key, entry in entries.items() if key is not None}
+        match section:
+            case LangData.GENERAL: self._interpret_general(entries)
+            case LangData.GRAPHEMES: self._interpret_orthography(entries)
+            case LangData.FEATURES: self._interpret_features(entries)
+            case LangData.MORPHEMES: self._interpret_morphemes(entries)
+            case LangData.RULES: self._interpret_morpheme_rules(entries)
+
+    def _forget(self, section: str, keys: Iterable[str]) -> None:
+        container: dict = getattr(self._language, self._containers[section])
+        for key in keys:
+            if section == LangData.GRAPHEMES and key == LangData.RULES:
+                self._language.grapheme_rules.clear()
+            else:
+                container.pop(key, None)
+        if section == LangData.GRAPHEMES:
+            self._language.invalidate()
+
+    def _interpret_general(self, general: dict) -> None:
+        self._language.general.update(general)
 
     def _interpret_orthography(self, orthography: dict) -> None:
-        self._interpret_graphemes(orthography.get(LangData.GRAPHEMES))
-        self._interpret_grapheme_rules(orthography.get(LangData.RULES))
+        self._interpret_graphemes({key: value for key, value in orthography.items() if key != LangData.RULES})
+        self._interpret_grapheme_rules(orthography.get(LangData.RULES) or {})
 
     def _interpret_morphology(self, morphology: dict) -> None:
-        self._interpret_morphemes(morphology.get(LangData.MORPHEMES))
-        self._interpret_morpheme_rules(morphology.get(LangData.RULES))
+        self._interpret_features(morphology.get(LangData.FEATURES) or {})
+        self._interpret_morphemes(morphology.get(LangData.MORPHEMES) or {})
+        self._interpret_morpheme_rules(morphology.get(LangData.RULES) or {})
+
+    def _interpret_features(self, features: dict) -> None:
+        self._language.features.update(features)
 
     def _interpret_graphemes(self, graphemes: dict) -> None:
-        raise NotImplementedError
+        self._language.graphemes.update(graphemes)
+        self._language.invalidate()
 
     def _interpret_grapheme_rules(self, grapheme_rules: dict) -> None:
-        raise NotImplementedError
+        self._language.grapheme_rules.update(grapheme_rules)
 
     def _interpret_morphemes(self, morphemes: dict) -> None:
-        raise NotImplementedError
+        self._language.morphemes.update(morphemes)
 
     def _interpret_morpheme_rules(self, morpheme_rules: dict) -> None:
-        raise NotImplementedError
+        self._language.rules.update(morpheme_rules)
+
+
+@dataclass
+class BulkLoad:
+    languages: dict[str, Language] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    failures: dict[str, Exception] = field(default_factory=dict)
+
+
+def _load_timed(path: Path, language: str, kwargs: dict) -> tuple[Optional[Language], float, Optional[Exception]]:
+    start = time.perf_counter()
+    try:
+        lang, exception = LangFactory(path, language, **kwargs).load(), None
+    except Exception as e:
+        lang, exception = None, e
+    return lang, time.perf_counter() - start, exception
 
 
 class LangFactory(ILoader, IPath):
-    def __init__(self, path: str | Path = '', language: str = '', **kwargs):
+    def __init__(self, path: str | Path = '', language: str = '', cache_path: str | Path = None, **kwargs):
         super().__init__(**kwargs)
-        self._lang_data_loader: LangDataLoader = LangDataLoader(path, language)
+        self._cached_loader = CachedYamlLoader(cache_path, autosave=False) if cache_path is not None else None
+        yaml_loader = self._cached_loader if self._cached_loader is not None else IncrementalYamlLoader()
+        self._lang_data_loader: LangDataLoader = LangDataLoader(path, language, yaml_loader=yaml_loader)
         self._lang_interpreter = LangaugeInterpreter()
+        self._validator = SchemaValidator()
+        self._language: Language | None = None
+        self.rules: RuleSet | None = None
 
     @property
     def path(self) -> Path:
@@ -50,6 +131,73 @@ class LangFactory(ILoader, IPath):
         self._lang_data_loader.path = path
 
     def load(self, language: str = None, **kwargs) -> Language:
+        previous = self._lang_data_loader.data
         lang_data = self._lang_data_loader.load(language, **kwargs)
-        lang = self._lang_interpreter.create(language, lang_data)
+        if self._cached_loader is not None and self._cached_loader.snapshot.language is not None:
+            if self._cached_loader.is_dirty:
+                self._cached_loader.save()
+            self._language = self._cached_loader.snapshot.language
+            self.rules = RuleSet(self._language)
+            return self._language
+        try:
+            lang = self._lang_interpreter.create(self._lang_data_loader.language, self._validated(lang_data))
+        except Exception:
+            self._lang_data_loader.data = previous
+            raise
+        self.rules = RuleSet(lang)
+        if self._cached_loader is not None:
+            self._cached_loader.save(lang)
+        self._language = lang
         return lang
+
+    def _validated(self, lang_data: Mapping) -> Mapping:
+        morphemes = lang_data.get(LangData.MORPHEMES)
+        if morphemes is None or isinstance(morphemes, Mapping):
+            self._validator.check(lang_data)
+        else:
+            self._validator.check({section: entries for section, entries in lang_data.items() if section != LangData.MORPHEMES})
+            lang_data = {**lang_data, LangData.MORPHEMES: self._validator.validated_morphemes(morphemes)}
+        return lang_data
+
+    def reload(self, **kwargs) -> LangDataDiff:
+        if self._language is None:
+            self._language = self._lang_interpreter.create(self._lang_data_loader.language, {})
+        previous = self._lang_data_loader.data
+        diff = self._lang_data_loader.reload(**kwargs)
+        try:
+            self._validator.check({section: {**diff.added.get(section, {}), **diff.changed.get(section, {})} for section in diff.sections})
+            if diff:
+                self._lang_interpreter.update(self._language, diff)
+        except Exception:
+            # the next reload diffs against the data the language was built from
+            self._lang_data_loader.data = previous
+            raise
+        if self.rules is None or LangData.RULES in diff.sections:
+            self.rules = RuleSet(self._language)
+        if self._cached_loader is not None and (diff or self._cached_loader.is_dirty):
+            self._cached_loader.save(self._language)
+        return diff
+
+    @classmethod
+    def discover(cls, path: str | Path) -> list[str]:
+        yaml_loader = YamlFileLoader()
+        return sorted(lang_path.name for lang_path in Path(path).iterdir() if lang_path.is_dir() and any(map(yaml_loader.is_yaml, lang_path.iterdir())))
+
+    @classmethod
+    def load_all(cls, path: str | Path, max_workers: int = None, executor: Executor = None, **kwargs) -> BulkLoad:
+        '''
+        Loads every language found in path in a worker pool, a failing language is reported in the result instead of
+        stopping the others. kwargs are passed to every LangFactory
+        '''
+        result = BulkLoad()
+        pool_context = nullcontext(executor) if executor is not None else futures.ProcessPoolExecutor(max_workers)
+        with pool_context as pool:
+            submitted = {pool.submit(_load_timed, Path(path), language, kwargs): language for language in cls.discover(path)}
+            for future in futures.as_completed(submitted):
+                language = submitted[future]
+                lang, result.timings[language], exception = future.result()
+                if exception is not None:
+                    result.failures[language] = exception
+                else:
+                    result.languages[language] = lang
+        return result
@@ -1,5 +1,24 @@
+from functools import lru_cache
 from typing import Any
 
+from src.segmentation import CacheInfo, SegmentationCache, Segmenter, grapheme_inventory
+
+VOWEL_LETTERS = frozenset('aeiouyäöüáéíóúàèìòùâêîôû')
+SEMIVOWEL_LETTERS = frozenset('jw')
+CONSONANT_LETTERS = frozenset('bcdfghjklmnpqrstvwxzßç')
+
+
+@lru_cache(maxsize=64)
+def step_members_of(inventory: frozenset[str]) -> dict[str, frozenset[str]]:
+    '''
+    The graphemes of an inventory by the class a morpheme steps by: the vowels, every grapheme of vowel letters only
+    like the diphthongs, the semivowels and the consonants, all the others. Without an inventory the letters are used
+    '''
+    if not inventory:
+        return Language.general_step_members
+    vowels = frozenset(grapheme for grapheme in inventory if set(grapheme) <= VOWEL_LETTERS)
+    return {'VOWELS': vowels, 'SEMIVOWELS': inventory & SEMIVOWEL_LETTERS, 'CONSONANTS': inventory - vowels}
+
 
 class IName:
     def __init__(self, name: str, **kwargs):
@@ -38,6 +57,79 @@ class Langel(IName, IKind):
 
 
 class Language(IName):
-    def __init__(self, name: str):
+    general_step_members: dict[str, frozenset[str]] = {'VOWELS': VOWEL_LETTERS, 'SEMIVOWELS': SEMIVOWEL_LETTERS, 'CONSONANTS': CONSONANT_LETTERS}
+
+    def __init__(self, name: str, segmentation_maxsize: int = SegmentationCache.DEFAULT_MAXSIZE):
         super().__init__(name=name)
+        self.segmentation_maxsize: int = segmentation_maxsize
+        self.general: dict = {}
+        self.features: dict = {}
+        self.graphemes: dict = {}
+        self.grapheme_rules: dict = {}
+        self.morphemes: dict = {}
+        self.rules: dict = {}
+        self._inventory: frozenset[str] | None = None
+        self._step_members: dict[str, frozenset[str]] | None = None
+        self._segmentation: SegmentationCache | None = None
+        self._step_segmentations: dict[str, SegmentationCache] = {}
+
+    def __getstate__(self) -> dict:
+        # the segmentation caches are filled by the process using the language, they are not part of a snapshot
+        return {**self.__dict__, '_inventory': None, '_step_members': None, '_segmentation': None, '_step_segmentations': {}}
+
+    @property
+    def inventory(self) -> frozenset[str]:
+        '''
+        The graphemes of the language, gathered once, invalidate() after changing them
+        '''
+        if self._inventory is None:
+            self._inventory = grapheme_inventory(self.graphemes)
+        return self._inventory
+
+    @property
+    def segmenter(self) -> Segmenter:
+        '''
+        The segmenter of the grapheme inventory, compiled once per inventory
+        '''
+        return Segmenter.of(self.inventory)
+
+    @property
+    def step_members(self) -> dict[str, frozenset[str]]:
+        if self._step_members is None:
+            self._step_members = step_members_of(self.inventory)
+        return self._step_members
+
+    @property
+    def segmentation(self) -> SegmentationCache:
+        '''
+        The segmentation cache of the language, it is emptied by invalidate()
+        '''
+        if self._segmentation is None:
+            self._segmentation = SegmentationCache(self.segmenter, self.segmentation_maxsize)
+        return self._segmentation
+
+    def step_segmentation(self, by: str) -> SegmentationCache:
+        '''
+        The segmentation cache of the graphemes of a step class, e.g. the vowels, the morphemes of the language stepping
+        by the class share it. It is emptied by invalidate()
+        '''
+        if (segmentation := self._step_segmentations.get(by)) is None:
+            segmentation = self._step_segmentations[by] = SegmentationCache(Segmenter.of(self.step_members[by]), self.segmentation_maxsize)
+        return segmentation
+
+    def segmentation_info(self) -> dict[str, CacheInfo]:
+        '''
+        The statistics of the segmentation cache of every step class used so far
+        '''
+        return {by: segmentation.info() for by, segmentation in self._step_segmentations.items()}
+
+    def invalidate(self) -> None:
+        '''
+        Forgets what was derived from the graphemes, to be called once they changed
+        '''
+        self._inventory = self._step_members = None
+        if self._segmentation is not None:
+            self._segmentation.invalidate(self.segmenter)
+        for by, segmentation in self._step_segmentations.items():
+            segmentation.invalidate(Segmenter.of(self.step_members[by]))
 
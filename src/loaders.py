@@ -1,9 +1,81 @@
+from __future__ import annotations
+
+import mmap
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import cache
 from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from src.constants import LangData
+from src.exceptions import InvalidPathException, InvalidYamlException, Messages
+from src.utils import lazy_import
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+yaml = lazy_import('yaml')
+futures = lazy_import('concurrent.futures')
+
+# a plain key may start with - or ? followed by a non-space, e.g. the suffix -ing
+_top_level_key = re.compile(rb'^((?:[-?][^\s]|[^\s#\-?\[{&*!|>%@`])[^\n]*?):(?:[ \t]|\r?$)', re.MULTILINE)
+_column_zero = re.compile(rb'^[^\s#]', re.MULTILINE)
+_unsplittable = re.compile(rb'^(?:---|\.\.\.|%|-[ \t\r\n]|[\[{])', re.MULTILINE)
+# an entry may refer to the anchor of another one, it cannot be parsed alone then
+_anchor_or_alias = re.compile(rb'(?:^|[\s\[{,])[&*][^\s\[\]{},]', re.MULTILINE)
+
+
+def is_splittable(content: bytes) -> bool:
+    return not _unsplittable.search(content) and not _anchor_or_alias.search(content)
+
+
+def _top_level_keys(content: bytes) -> Optional[list[re.Match]]:
+    '''
+    The lines starting the top-level entries, None unless every line of the top level starts one, e.g. a tagged key
+    '''
+    if not is_splittable(content):
+        return None
+    matches = list(_top_level_key.finditer(content))
+    return matches if len(matches) == sum(1 for _ in _column_zero.finditer(content)) else None
+
+
+def get_top_level_offsets(content: bytes) -> Optional[list[int]]:
+    '''
+    Byte offsets of the lines starting the entries of a top-level block mapping, None if the document is not one or
+    its entries cannot be parsed on their own
+    '''
+    matches = _top_level_keys(content)
+    return [match.start() for match in matches] if matches is not None else None
 
-import yaml
 
-from src.exceptions import InvalidPathException
+def get_top_level_index(content: bytes) -> Optional[list[tuple[bytes, int]]]:
+    matches = _top_level_keys(content)
+    return [(match.group(1).rstrip(), match.start()) for match in matches] if matches is not None else None
+
+
+def split_yaml(content: bytes, chunk_size: int) -> list[bytes]:
+    offsets = get_top_level_offsets(content) if len(content) > chunk_size else None
+    if not offsets:
+        return [content]
+    chunks, start = [], 0
+    for offset in offsets:
+        if offset - start >= chunk_size:
+            chunks.append(content[start:offset])
+            start = offset
+    chunks.append(content[start:])
+    return chunks
+
+
+@cache
+def get_safe_loader() -> type:
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parse_yaml(content: str | bytes) -> dict | list:
+    return yaml.load(content, Loader=get_safe_loader())
 
 
 class IPath:
@@ -39,9 +111,39 @@ class YamlFileLoader(ILoader, IPath):
     def load(self, path: str | Path = None, **kwargs) -> dict | list:
         self.set_path_if_not_none(path, **kwargs)
         with open(path, 'r') as f:
-            data = yaml.safe_load(f)
+            data = self.parse(f)
         return data
 
+    def parse(self, content: str | bytes | IO) -> dict | list:
+        return yaml.safe_load(content)
+
+    def iter_items(self, path: str | Path) -> Iterator[tuple[Any, Any]]:
+        '''
+        Yields the (key, value) pairs of a top-level mapping one at a time, composing only the current entry from the
+        parse events, so the memory stays bounded by the biggest entry. Duplicated keys are yielded each time
+        '''
+        with open(path, 'rb') as f:
+            loader = yaml.SafeLoader(f)
+            try:
+                loader.get_event()
+                if loader.check_event(yaml.StreamEndEvent):
+                    return
+                loader.get_event()
+                if not loader.check_event(yaml.MappingStartEvent):
+                    data = loader.construct_document(loader.compose_node(None, None))
+                    if data is not None:
+                        raise InvalidYamlException(f'{Path(path).name} > ', Messages.NOT_A_MAPPING)
+                    return
+                loader.get_event()
+                while not loader.check_event(yaml.MappingEndEvent):
+                    key_node = loader.compose_node(None, None)
+                    value_node = loader.compose_node(None, None)
+                    key, value = loader.construct_object(key_node, deep=True), loader.construct_object(value_node, deep=True)
+                    loader.constructed_objects.clear()
+                    yield key, value
+            finally:
+                loader.dispose()
+
     def is_yaml(self, path: Path) -> bool:
         return path.suffix in ('.yaml', '.yml')
 
@@ -49,30 +151,332 @@ class YamlFileLoader(ILoader, IPath):
 class YamlLoader(YamlFileLoader, ILoader):
     def load(self, path: str | Path = None, **kwargs) -> dict:
         self.set_path_if_not_none(path, **kwargs)
-        data = self._load_single(path)
+        data = self._load_single(Path(path) if path is not None else self.path)
         return data
 
     def _load_single(self, path: Path) -> dict | list:
         if path.is_dir():
-            return {file.stem: self._load_single(file) for file in self.path.iterdir()}
+            return {file.stem: self._load_single(file) for file in path.iterdir()}
+        elif path.is_file() and self.is_yaml(path):
+            return self._load_file(path)
+        else:
+            raise InvalidPathException
+
+    def _load_file(self, path: Path) -> dict | list:
+        return super().load(path, set_path=False)
+
+
+class ParallelYamlLoader(YamlLoader):
+    '''
+    Parses all the files of a language in a process pool with libyaml when available. Files bigger than chunk_size
+    are split between their top-level keys so that a single huge lexicon is parsed in parallel as well
+    '''
+    def __init__(self, path: str | Path = '', max_workers: int = None, chunk_size: int = 1 << 20, executor: Executor = None, **kwargs):
+        super().__init__(path=path, **kwargs)
+        self.max_workers: Optional[int] = max_workers
+        self.chunk_size: int = chunk_size
+        self.executor: Optional[Executor] = executor
+        self._parsed: dict[Path, dict | list] = {}
+
+    def parse(self, content: str | bytes | IO) -> dict | list:
+        return parse_yaml(content)
+
+    def load(self, path: str | Path = None, **kwargs) -> dict:
+        root = Path(path) if path is not None else self.path
+        self._parsed = self._parse_all(list(self._find_files(root)))
+        try:
+            return super().load(path, **kwargs)
+        finally:
+            self._parsed = {}
+
+    def _load_file(self, path: Path) -> dict | list:
+        return self._parsed[path]
+
+    def _find_files(self, path: Path) -> Iterable[Path]:
+        if path.is_dir():
+            for file in path.iterdir():
+                yield from self._find_files(file)
         elif path.is_file() and self.is_yaml(path):
-            return super().load(path, set_path=False)
+            yield path
         else:
             raise InvalidPathException
 
+    def _parse_all(self, files: list[Path]) -> dict[Path, dict | list]:
+        contents = {file: file.read_bytes() for file in files}
+        chunked = {file: split_yaml(content, self.chunk_size) for file, content in contents.items()}
+        all_chunks = [chunk for chunks in chunked.values() for chunk in chunks]
+        if len(all_chunks) <= 1:
+            return {file: self.parse(content) for file, content in contents.items()}
+
+        executor = nullcontext(self.executor) if self.executor is not None else futures.ProcessPoolExecutor(self.max_workers)
+        with executor as pool:
+            parsed_chunks = iter(list(pool.map(self._parse_chunk, all_chunks)))
+        parsed = {}
+        for file, chunks in chunked.items():
+            file_chunks = [next(parsed_chunks) for _ in chunks]
+            parsed[file] = self._merge_chunks(file_chunks, contents[file])
+        return parsed
+
+    @staticmethod
+    def _parse_chunk(chunk: bytes) -> dict | list | yaml.YAMLError:
+        try:
+            return parse_yaml(chunk)
+        except yaml.YAMLError as e:
+            return e
+
+    def _merge_chunks(self, chunks: list, content: bytes) -> dict | list:
+        if len(chunks) == 1 and not isinstance(chunks[0], yaml.YAMLError):
+            return chunks[0]
+        if not all(isinstance(chunk, dict | None) for chunk in chunks):
+            return self.parse(content)  # an unlucky split or a genuine error, the whole file gives the right answer
+        merged = {}
+        for chunk in chunks:
+            merged.update(chunk or {})
+        return merged
+
+
+class IncrementalYamlLoader(YamlLoader):
+    '''
+    Remembers what it has parsed. A file with unchanged size and mtime is not read again and in a changed file only
+    the top-level entries whose text changed are parsed again
+    '''
+    def __init__(self, path: str | Path = '', **kwargs):
+        super().__init__(path=path, **kwargs)
+        self.parsed: list[bytes] = []
+        self._files: dict[Path, tuple[tuple[int, int], dict | list]] = {}
+        self._entries: dict[Path, dict[bytes, dict]] = {}
+
+    def load(self, path: str | Path = None, **kwargs) -> dict:
+        self.parsed = []
+        return super().load(path, **kwargs)
+
+    def _load_file(self, path: Path) -> dict | list:
+        stat = path.stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        previous_stamp, data = self._files.get(path, (None, None))
+        if previous_stamp != stamp:
+            data = self._parse_entries(path, path.read_bytes())
+            self._files[path] = (stamp, data)
+        return data
+
+    def _parse_entries(self, path: Path, content: bytes) -> dict | list:
+        offsets = get_top_level_offsets(content)
+        previous = self._entries.pop(path, {})
+        if not offsets:
+            self.parsed.append(content)
+            return self.parse(content)
+
+        bounds = [0, *offsets[1:], len(content)]
+        slices = [content[start:end] for start, end in zip(bounds, bounds[1:])]
+        if not previous:
+            entries = self._parse_whole(content, slices)
+        else:
+            entries = {entry: previous[entry] if entry in previous else self._parse_entry(entry) for entry in slices}
+        if entries is None or not all(isinstance(entry, dict) for entry in entries.values()):
+            self.parsed.append(content)
+            return self.parse(content)
+
+        self._entries[path] = entries
+        data = {}
+        for entry in slices:
+            data.update(entries[entry])
+        return data
+
+    def _parse_whole(self, content: bytes, slices: list[bytes]) -> Optional[dict[bytes, dict]]:
+        self.parsed.append(content)
+        data = self.parse(content)
+        if not isinstance(data, dict) or len(data) != len(slices) or len(set(slices)) != len(slices):
+            return None
+        return {entry: {key: value} for entry, (key, value) in zip(slices, data.items())}
+
+    def _parse_entry(self, entry: bytes) -> dict | None:
+        self.parsed.append(entry)
+        try:
+            return self.parse(entry)
+        except yaml.YAMLError:
+            return None
+
+
+@dataclass
+class LangDataDiff:
+    added: dict[str, dict] = field(default_factory=dict)
+    removed: dict[str, dict] = field(default_factory=dict)
+    changed: dict[str, dict] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any(map(any, (self.added.values(), self.removed.values(), self.changed.values())))
+
+    @property
+    def sections(self) -> set[str]:
+        return {section for part in (self.added, self.removed, self.changed) for section, entries in part.items() if entries}
+
+    @classmethod
+    def between(cls, old: dict, new: dict) -> LangDataDiff:
+        diff = cls()
+        for section in old.keys() | new.keys():
+            old_entries, new_entries = old.get(section), new.get(section)
+            if old_entries is new_entries:
+                continue
+            old_entries = old_entries if isinstance(old_entries, dict) else {None: old_entries} if old_entries is not None else {}
+            new_entries = new_entries if isinstance(new_entries, dict) else {None: new_entries} if new_entries is not None else {}
+            diff.added[section] = {key: new_entries[key] for key in new_entries.keys() - old_entries.keys()}
+            diff.removed[section] = {key: old_entries[key] for key in old_entries.keys() - new_entries.keys()}
+            diff.changed[section] = {key: entry for key, entry in new_entries.items()
+                                     if key in old_entries and old_entries[key] is not entry and old_entries[key] != entry}
+        return diff
+
+
+class LazyYamlMapping(Mapping):
+    '''
+    The top-level mapping of a yaml file, indexed by the byte offsets of its keys. An entry is parsed on its first access
+    '''
+    def __init__(self, path: Path, parse: Callable[[bytes], Any] = parse_yaml):
+        self._parse = parse
+        self._resolver = yaml.resolver.Resolver()
+        self._content: bytes | mmap.mmap = b''
+        self._index: dict[Any, tuple[int, int]] = {}
+        self._entries: dict[Any, Any] = {}
+        if path.stat().st_size:
+            with open(path, 'rb') as f:
+                self._content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        index = get_top_level_index(self._content)
+        if index is None:
+            self._entries = self._parse(self._content[:]) or {}
+            self._index = dict.fromkeys(self._entries, (0, 0))
+            return
+        bounds = [start for _, start in index[1:]] + [len(self._content)]
+        starts = [0] + bounds[:-1]
+        self._index = {self._to_key(raw_key): (start, end) for (raw_key, _), start, end in zip(index, starts, bounds)}
+
+    def _to_key(self, raw_key: bytes) -> Any:
+        key = raw_key.decode('utf-8')
+        if key[0] in '\'"' or self._resolver.resolve(yaml.ScalarNode, key, (True, False)) != self._resolver.DEFAULT_SCALAR_TAG:
+            return self._parse(raw_key)
+        return key
+
+    def __getitem__(self, key: Any) -> Any:
+        if key not in self._entries:
+            start, end = self._index[key]
+            self._entries[key] = (self._parse(self._content[start:end]) or {})[key]
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._index
+
+    @property
+    def materialized(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        '''
+        Releases the file, the entries not accessed yet cannot be anymore
+        '''
+        if isinstance(self._content, mmap.mmap):
+            self._content.close()
+        self._content = b''
+
+    def __enter__(self) -> LazyYamlMapping:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class LazyLangData(Mapping):
+    '''
+    The language data keyed as YamlLoader keys it, but a file is parsed the first time its key is accessed and the files
+    of the indexed sections are LazyYamlMappings
+    '''
+    def __init__(self, path: Path, yaml_loader: YamlLoader = None, indexed: Iterable[str] = (LangData.MORPHEMES, )):
+        self._yaml_loader: YamlLoader = yaml_loader if yaml_loader is not None else YamlLoader()
+        self._indexed: tuple[str, ...] = tuple(indexed)
+        self._paths: dict[str, Path] = {file.stem: file for file in path.iterdir() if file.is_dir() or self._yaml_loader.is_yaml(file)}
+        self._sections: dict[str, Any] = {}
+
+    def __getitem__(self, section: str) -> Any:
+        if section not in self._sections:
+            path = self._paths[section]
+            if path.is_dir():
+                self._sections[section] = LazyLangData(path, self._yaml_loader, self._indexed)
+            elif section in self._indexed:
+                self._sections[section] = LazyYamlMapping(path, self._yaml_loader.parse)
+            else:
+                self._sections[section] = self._yaml_loader._load_single(path)
+        return self._sections[section]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, section: object) -> bool:
+        return section in self._paths
+
+    @property
+    def parsed(self) -> set[str]:
+        return set(self._sections)
+
+    def close(self) -> None:
+        '''
+        Releases the files of the indexed sections
+        '''
+        for section in self._sections.values():
+            if isinstance(section, (LazyYamlMapping, LazyLangData)):
+                section.close()
+
+    def __enter__(self) -> LazyLangData:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
 
 class LangDataLoader(ILoader, IPath):
-    def __init__(self, path: str | Path = '', language: str = '', **kwargs):
+    def __init__(self, path: str | Path = '', language: str = '', yaml_loader: YamlLoader = None, **kwargs):
         super().__init__(**kwargs)
         self.language: str = language
-        self._yaml_loader = YamlLoader(path)
+        self.data: dict = {}
+        self._yaml_loader = yaml_loader if yaml_loader is not None else YamlLoader()
+        self._yaml_loader.path = path
 
-    def load(self, language: str = None, **kwargs) -> dict:
+    def load(self, language: str = None, lazy: bool = False, stream: bool = False, **kwargs) -> dict | LazyLangData:
         if language is not None:
             self.language = language
-        lang_data = self._yaml_loader.load(self.true_path, **kwargs)
+        if lazy:
+            lang_data = LazyLangData(self.true_path, self._yaml_loader)
+        elif stream:
+            lang_data = self._load_streamed(self.true_path)
+        else:
+            try:
+                lang_data = self._yaml_loader.load(self.true_path, set_path=False, **kwargs)
+            except yaml.YAMLError as e:
+                raise InvalidYamlException(f'{self.language} > ', str(e)) from e
+        self.data = lang_data
         return lang_data
 
+    def _load_streamed(self, path: Path, streamed: Iterable[str] = (LangData.MORPHEMES, )) -> dict:
+        '''
+        The streamed sections are single-use iterators of (name, entry) pairs instead of dicts
+        '''
+        return {
+            file.stem: self._yaml_loader.iter_items(file) if file.stem in streamed and file.is_file() else self._yaml_loader._load_single(file)
+            for file in path.iterdir() if file.is_dir() or self._yaml_loader.is_yaml(file)
+        }
+
+    def reload(self, **kwargs) -> LangDataDiff:
+        previous = self.data
+        return LangDataDiff.between(previous, self.load(**kwargs))
+
     @property
     def path(self) -> Path:
         return self._yaml_loader.path
@@ -3,14 +3,18 @@ from __future__ import annotations
 from abc import abstractmethod
 from dataclasses import dataclass, asdict
 from functools import reduce
-from typing import Literal, TypeVar, Generic, Callable, Iterable, Tuple, Any, List, Optional
+from typing import Literal, TypeVar, Generic, Callable, Iterable, Iterator, Tuple, Any, List, Optional
 
-import numpy as np
+from src.language import Language
+from src.morphemes_nd import MU, languages
+from src.segmentation import SegmentationCache, SegmentedWord
+from src.utils import DictClass, get_name, get_extreme_points
 
-from src.morphemes_nd import MU
-from src.utils import DictClass, get_name, word_to_basics, get_extreme_points
+from src.morphemes_nd import At, Size, By, Side
 
-from morphemes_nd import At, Size, By, Side
+
+# the language of the morphemes without one, it steps by the vowel, semivowel and consonant letters
+GENERAL_LANGUAGE = Language('general')
 
 
 # TODO THINK: D dir class from py2neo lib?
@@ -81,9 +85,9 @@ class Orthography:
 
 
 class AbstractMorpheme(Generic[MU]):
-    def __init__(self, **kwargs):
+    def __init__(self, language: Language = None, **kwargs):
         super().__init__(**kwargs)
-        self.language = languages.associate(self)
+        self.language = language if language is not None else languages.associate(self)
 
     def _inverse_problem(self, problem: Callable, word: MU):
         reverse_result = problem(~self, word[::-1])
@@ -91,7 +95,7 @@ class AbstractMorpheme(Generic[MU]):
 
     @classmethod
     def _get_default(cls, name: str) -> MU | Any:
-        return StrDefaults._dict()[name]
+        return StrDefaults.dict()[name]
 
     @abstractmethod
     def _get_index_and_size(self, word: MU) -> Tuple[At, Size]:
@@ -131,6 +135,12 @@ class AbstractMorpheme(Generic[MU]):
     def __call__(self, word: MU, *args, **kwargs):
         raise NotImplementedError
 
+    def apply_many(self, words: Iterable[MU]) -> List[MU]:
+        return [self(word) for word in words]
+
+    def iter_many(self, words: Iterable[MU]) -> Iterator[MU]:
+        return (self(word) for word in words)
+
     @abstractmethod
     def __invert__(self) -> SimpleMorphemeND:
         raise NotImplementedError
@@ -142,7 +152,7 @@ class AbstractMorpheme(Generic[MU]):
 
 # TODO think: How to implement conditional src, pos: within the class, separately
 class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
-    is_using_inversion = True
+    is_using_inversion = False
 
     # TODO: change tests to encopass the raises argument
     def __init__(self, form1: MU = None, form2: MU = None, *, at: At = None, by: By = None, side: Side = None, raises: bool = False, **kwargs):
@@ -169,17 +179,11 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
 
     # TODO think: returning the size of the place
     def _get_index_and_size(self, word: MU) -> Tuple[At, Size]:
-        all_step_members = self.language.step_members if self.language is not None else Language.general_step_members
-        if self.by != By.LETTERS:
-            step_members = all_step_members[self.by]
-            index_parts = list(map(lambda e: tuple(reversed(e)), word_to_basics(word, step_members, yield_index=True, skip_missing=True)))
-        else:
-            index_parts = list(zip(range(0, len(word)), word))  # TODO think: better size handling
-        adjusted_at = self.at - 1 if self.at > 0 else np.subtract(len(word), self.at)
-        index, size = next(((index, len(part)) for (i, (index, part)) in enumerate(index_parts) if i == adjusted_at), tuple((len(word), 0)))  # TODO Generalize default empty
-        if abs(self.at) > index + 1:
-            raise ValueError  # TODO: more test to verify
-        return index, size
+        '''
+        The index and the size of the place, counted from the end of the word for a negative position. A place the word
+        is too short for is its end, or its start for a negative position as the index -1 of size 0
+        '''
+        return self._cached('locate', self._locator)(word)
 
     def _get_word_parts(self, word: MU, place: At, size: Size = 1, side=None) -> Tuple[MU, ...]:
         side = side if side is not None else self.side
@@ -192,8 +196,6 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
                 return self._get_word_parts(word, place + size, size, Side.BEFORE)  # TODO think: or size?
 
     def is_applicable(self, word: MU, *args, **kwargs) -> bool:
-        if self.is_using_inversion and self.at < 0:
-            return self._inverse_problem(SimpleMorphemeND.insert, word)
         try:
             index, size = self._get_index_and_size(word)
         except ValueError:
@@ -211,8 +213,6 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
         return self.to_remove in remove_range
 
     def is_present(self, word: MU, *args, **kwargs) -> MU:
-        if self.is_using_inversion and self.at < 0:
-            return self._inverse_problem(SimpleMorphemeND.insert, word)
         try:
             index, size = self._get_index_and_size(word)
         except ValueError:
@@ -222,17 +222,11 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
 
     def insert(self, word: MU, *args, **kwargs) -> MU:
         # TODO move this to abstract after generalizing num of parts and it's concatanation with form
+        if isinstance(word, SegmentedWord):
+            return self._insert_segmented(word)
         if self.is_using_inversion and self.at < 0:
             return self._inverse_problem(SimpleMorphemeND.insert, word)
-        try:
-            index, size = self._get_index_and_size(word)
-        except ValueError as e:
-            if self.raises:
-                raise e
-            return word
-        part1, part2 = self._get_word_parts(word, index)
-        result = part1 + self.to_insert + part2
-        return result
+        return self._cached('insert', self._inserter)(word)
 
     # def remove(self, word: MU, *args, **kwargs) -> MU:
     #     # TODO move this to abstract after generalizing num of parts and it's concatanation with form
@@ -248,23 +242,11 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
 
     def replace(self, word: MU, *args, **kwargs) -> MU:
         # TODO move this to abstract after generalizing "negativity of at, inversing problem according to specific axis""
+        if isinstance(word, SegmentedWord):
+            return self._replace_segmented(word)
         if self.is_using_inversion and self.at < 0:
             return self._inverse_problem(SimpleMorphemeND.replace, word)
-        try:
-            index, size = self._get_index_and_size(word)
-        except ValueError as e:
-            if self.raises:
-                raise e
-            return word
-        min_point, max_point = get_extreme_points(word, index, len(self.to_remove))
-        middle = word[min_point:max_point]
-        if self.to_remove not in middle:
-            if self.raises:
-                raise ValueError  # TODO specify
-            return word
-        # TODO: make more precise
-        result = word[:min_point] + middle.replace(self.to_remove, self.to_insert) + word[max_point:]
-        return result
+        return self._cached('replace', self._replacer)(word)
 
     def __call__(self, word: MU, *args, **kwargs):
         if self.to_remove and self.to_insert:
@@ -276,8 +258,156 @@ class SimpleMorphemeND(AbstractMorpheme, Generic[MU]):
         else:
             return word
 
+    def _locate_segmented(self, word: SegmentedWord) -> Optional[Tuple[At, Size]]:
+        return word.locate(int(self.at), None if self.by == By.LETTERS else self.by)
+
+    def _insert_segmented(self, word: SegmentedWord) -> SegmentedWord:
+        '''
+        insert on a segmented word, a negative position counts from the end of the word instead of inverting it
+        '''
+        try:
+            found = self._locate_segmented(word)
+        except ValueError as e:
+            if self.raises:
+                raise e
+            return word
+        if found is None:
+            cut = len(word) if self.at >= 0 else 0
+            return word.splice(cut, cut, self.to_insert)
+        index, size = found
+        if self.side == Side.AT:
+            return word.splice(index, index + size, self.to_insert)
+        cut = index if self.side == Side.BEFORE else index + size
+        return word.splice(cut, cut, self.to_insert)
+
+    def _replace_segmented(self, word: SegmentedWord) -> SegmentedWord:
+        try:
+            found = self._locate_segmented(word)
+        except ValueError as e:
+            if self.raises:
+                raise e
+            return word
+        index = found[0] if found is not None else len(word) if self.at >= 0 else -1
+        min_point, max_point = get_extreme_points(word.text, index, len(self.to_remove))
+        middle = word.text[min_point:max_point]
+        if self.to_remove not in middle:
+            if self.raises:
+                raise ValueError  # TODO specify
+            return word
+        # from the end for a negative position, as the inverted morpheme would
+        replaced = middle.replace(self.to_remove, self.to_insert) if self.at >= 0 else middle[::-1].replace(self.to_remove[::-1], self.to_insert[::-1])[::-1]
+        return word.splice(min_point, max_point, replaced)
+
+    def apply_many(self, words: Iterable[MU]) -> List[MU]:
+        '''
+        The results of calling the morpheme on every word, in order, with the setup done once for all of them
+        '''
+        return list(map(self._word_function(), words))
+
+    def iter_many(self, words: Iterable[MU]) -> Iterator[MU]:
+        '''
+        Like apply_many for a stream of words, a result is made when it is asked for
+        '''
+        return map(self._word_function(), words)
+
+    def _word_function(self) -> Callable[[MU], MU]:
+        '''
+        What __call__ does to a word, with the dispatch and the position settings resolved beforehand
+        '''
+        if not self.to_remove and not self.to_insert:
+            return lambda word: word
+        if self.is_using_inversion and self.at < 0:
+            inverse = (~self)._word_function()
+            return lambda word: inverse(word[::-1])[::-1]
+        return self._cached('replace', self._replacer) if self.to_remove else self._cached('insert', self._inserter)
+
+    def _cached(self, name: str, build: Callable[[], Any]) -> Any:
+        '''
+        What build made for the current settings of the morpheme, made again once any of them, its language or the step
+        members in it changed
+        '''
+        settings = (self.to_remove, self.to_insert, self.at, self.by, self.side, self.raises, self.language, self._step_members())
+        cache = self.__dict__.setdefault('_cache', {})
+        if (cached := cache.get(name)) is None or cached[0] != settings:
+            cached = cache[name] = settings, build()
+        return cached[1]
+
+    def _step_members(self) -> Optional[frozenset[str]]:
+        return (self.language if self.language is not None else GENERAL_LANGUAGE).step_members.get(self.by)
+
+    def _step_segmentation(self) -> SegmentationCache:
+        '''
+        The segmentation cache of the step class in the language of the morpheme, in the general language without one
+        '''
+        return (self.language if self.language is not None else GENERAL_LANGUAGE).step_segmentation(self.by)
+
+    def _locator(self) -> Callable[[MU], Tuple[At, Size]]:
+        '''
+        _get_index_and_size in plain integers, the graphemes of the step members come from their segmentation cache
+        '''
+        at = int(self.at)
+        if self.by == By.LETTERS:
+            def locate(word: MU) -> Tuple[At, Size]:
+                size = len(word)
+                index = at - 1 if at > 0 else size + at if at < 0 else size
+                if 0 <= index < size:
+                    return index, 1
+                if abs(at) > size + 1:
+                    raise ValueError  # TODO: more test to verify
+                return (size, 0) if at >= 0 else (-1, 0)
+            return locate
+
+        segmentation = self._step_segmentation()
+
+        def locate_steps(word: MU) -> Tuple[At, Size]:
+            if (found := segmentation.span(word, at)) is not None:
+                return found
+            if abs(at) > len(word) + 1:
+                raise ValueError
+            return (len(word), 0) if at >= 0 else (-1, 0)
+        return locate_steps
+
+    def _inserter(self) -> Callable[[MU], MU]:
+        locate, raises, to_insert, side = self._locator(), self.raises, self.to_insert, int(self.side)
+        # where the form goes in and where the rest of the word starts, in sizes of the place
+        start, end = (0, 0) if side == Side.BEFORE else (0, 1) if side == Side.AT else (1, 1)
+
+        def insert(word: MU) -> MU:
+            try:
+                index, size = locate(word)
+            except ValueError:
+                if raises:
+                    raise
+                return word
+            if index < 0:
+                return to_insert + word
+            return word[:index + start * size] + to_insert + word[index + end * size:]
+        return insert
+
+    def _replacer(self) -> Callable[[MU], MU]:
+        locate, raises, to_remove, to_insert = self._locator(), self.raises, self.to_remove, self.to_insert
+        # for a negative position the occurrences are replaced from the end, as the inverted morpheme would
+        is_from_end, span = self.at < 0 and bool(to_remove), len(to_remove)
+
+        def replace(word: MU) -> MU:
+            try:
+                index, _ = locate(word)
+            except ValueError:
+                if raises:
+                    raise
+                return word
+            min_point, max_point = max(index - span, 0), min(index + span + 1, len(word))  # as get_extreme_points
+            middle = word[min_point:max_point]
+            if to_remove not in middle:
+                if raises:
+                    raise ValueError  # TODO specify
+                return word
+            middle = to_insert.join(middle.rsplit(to_remove)) if is_from_end else middle.replace(to_remove, to_insert)
+            return word[:min_point] + middle + word[max_point:]
+        return replace
+
     def __invert__(self) -> SimpleMorphemeND:
-        return SimpleMorphemeND(self.to_remove[::-1], self.to_insert[::-1], at=np.subtract(0, self.at), by=self.by, side=np.subtract(0, self.side))
+        return self._cached('inverse', lambda: SimpleMorphemeND(self.to_remove[::-1], self.to_insert[::-1], at=-self.at, by=self.by, side=-self.side, raises=self.raises, language=self.language))
 
     def __add__(self, other: SimpleMorphemeND):
         if self.language != other.language:
@@ -342,12 +472,12 @@ class Morpheme(SimpleMorphemeND, ComplexMorphemeND, ConditionalMorphemeND):
 
 class Prefix(SimpleMorphemeND):
     def __init__(self, form: MU):
-        super().__init__(form, at=self.first, by=By.LETTERS, side=self.before)
+        super().__init__(None, form, at=StrDefaults.first, by=By.LETTERS, side=StrDefaults.before)
 
 
 class Postfix(SimpleMorphemeND):
     def __init__(self, form: MU):
-        super().__init__(form, at=self.last, by=By.LETTERS, side=self.after)
+        super().__init__(None, form, at=StrDefaults.last, by=By.LETTERS, side=StrDefaults.after)
 
 
 class Suffix(Postfix):
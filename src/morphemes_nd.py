@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from dataclasses import asdict
+from functools import reduce
 from typing import TypeVar, Generic, Callable, Literal, Iterable, Optional
 
+from src.feature_table import FeatureTable
+from src.language import step_members_of
 from src.utils import get_name
 
 MU = TypeVar('MU')  # Morpheme Unit
@@ -36,6 +38,16 @@ class MetaLanguages(type):
     def __contains__(self, name):
         return name in self._languages
 
+    def forget(cls, lang: str | Language) -> None:
+        '''
+        Removes a language, it stops being the current one if it was
+        '''
+        lang = cls._languages.get(lang) if isinstance(lang, str) else lang
+        for name in [name for name, known in cls._languages.items() if known is lang]:
+            del cls._languages[name]
+        if lang is not None and cls._current is lang:
+            cls._current = None
+
     def keys(cls):
         return cls._languages.keys()
 
@@ -67,29 +79,91 @@ class languages(metaclass=MetaLanguages):  # TODO test access
 
 
 class Characteristic:
+    '''
+    A node of the feature tree. Every node keeps the closure of its subtree, all the characteristics below it by name,
+    and its parent, so membership and the parent of a characteristic are single lookups. Adding a characteristic
+    extends the closures of the node and of its ancestors only
+    '''
     def __init__(self, name: str, characterizings: Iterable[Characteristic], characteristics: Iterable[Characteristic]):
         self.name: str = name
+        self.parent: Optional[Characteristic] = None
         self.characterizings: dict[str, Characteristic] = {characterizing.name: characterizing for characterizing in characterizings}  # noun, etc.
-        self.characteristics: dict[str, Characteristic] = {characteristic.name: characteristic for characteristic in characteristics} # masculine, feminine
+        self.characteristics: dict[str, Characteristic] = {}  # masculine, feminine
+        self.closure: dict[str, Characteristic] = {}
+        for characteristic in characteristics:
+            self.add(characteristic)
+
+    def add(self, characteristic: Characteristic) -> None:
+        '''
+        Adds a characteristic below the node, a name already in the tree is a ValueError as names identify them
+        '''
+        added = {characteristic.name: characteristic, **characteristic.closure}
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root.name in added or not added.keys().isdisjoint(root.closure):
+            raise ValueError
+        characteristic.parent = self
+        self.characteristics[characteristic.name] = characteristic
+        node = self
+        while node is not None:
+            node.closure.update(added)
+            node = node.parent
 
     def __getitem__(self, characteristic: str) -> Optional[Characteristic]:
         return self.characteristics.get(characteristic, None)
 
     def __contains__(self, characteristic):  # TODO: warning, it may not always be an expected behaviour
-        return characteristic in self.characteristics or any((characteristic in characteristic_object for characteristic_object in self.characteristics.values()))
+        return characteristic in self.closure
+
+    def find(self, characteristic: str) -> Optional[Characteristic]:
+        return self.closure.get(characteristic)
+
+    def parent_of(self, characteristic: str) -> Optional[str]:
+        found = self.closure.get(characteristic)
+        return found.parent.name if found is not None else None
 
 
 class Language(Generic[MU]):
+    _elements = ('graphemes', 'morphemes')
 
     def __init__(self, name: str, featured: Iterable[Characteristic], features: Iterable[Characteristic]):
         languages[name] = self
         self.feature_description: Characteristic = Characteristic(name, featured, features)
-        self.orthography = Orthography()  # TODO rethink creation args and method
+        self.feature_category: dict[str, tuple[str, ...]] = self._get_feature_categories(self.feature_description)
+        self.value_category: dict[str, str] = {value: category for category, values in self.feature_category.items() for value in values}
+        self.feature_table = FeatureTable()
+        self.graphemes = {}  # TODO rethink creation args and method, an orthography?
         self.morphemes = {}
 
+    @staticmethod
+    def _get_feature_categories(description: Characteristic) -> dict[str, tuple[str, ...]]:
+        return {name: tuple(characteristic.characteristics) for name, characteristic in description.closure.items() if characteristic.characteristics}
+
+    def add_feature(self, feature: Characteristic, category: str = None) -> None:
+        '''
+        Adds a feature to the tree, under a category or at the top, only the categories it touches are recomputed
+        '''
+        parent = self.feature_description if category is None else self.feature_description.find(category)
+        if parent is None:
+            raise ValueError
+        parent.add(feature)
+        for characteristic in (parent, feature, *feature.closure.values()):
+            if characteristic is not self.feature_description and characteristic.characteristics:
+                self.feature_category[characteristic.name] = tuple(characteristic.characteristics)
+                self.value_category.update(dict.fromkeys(characteristic.characteristics, characteristic.name))
+
+    def category_column(self, category: str) -> list[Optional[str]]:
+        '''
+        The value of a category for every element of the feature table at once, by row
+        '''
+        if category not in self.feature_category:
+            raise ValueError
+        return self.feature_table.values(category)
+
     def get(self, language_elem: str) -> dict:
         key = language_elem.lower()
-        if key in asdict(LanguageElems()).values():
+        if key in self._elements:
             return self.__dict__[key]
         raise ValueError
 
@@ -104,8 +178,8 @@ class Language(Generic[MU]):
 
     def _associate_single(self, to_associate: Grapheme | Morpheme) -> Language:  # TODO add annotation
         match to_associate:
-            case Grapheme() | Morpheme():
-                language_elems = self.get(f'{type(to_associate).__name__}s'.lower())
+            case Grapheme() | MorphemeND():
+                language_elems = self.get('graphemes' if isinstance(to_associate, Grapheme) else 'morphemes')
                 language_elems[to_associate.name] = to_associate
             case _:
                 raise NotImplementedError
@@ -114,6 +188,10 @@ class Language(Generic[MU]):
     def has_feature(self, feature: str) -> bool:
         return feature in self.feature_description
 
+    @property
+    def step_members(self) -> dict[str, frozenset[str]]:
+        return step_members_of(frozenset(self.graphemes))
+
 
 class LanguageElement:
     def __init__(self, name: str, *args, **kwargs):
@@ -124,33 +202,65 @@ class LanguageElement:
 
 
 class Featured(LanguageElement):
+    '''
+    The features are not kept by the element but in a row of the feature table of its language, or of a table of its
+    own without a language
+    '''
     def __init__(self, name: str, **features):
+        self.language = None
         super().__init__(name)
-        self._features: dict = features
+        self._table: FeatureTable = self.language.feature_table if self.language is not None else FeatureTable()
+        self._row: int = self._table.add_row()
+        value_category = self.language.value_category if self.language is not None else {}
+        for feature, value in features.items():
+            if feature in value_category:
+                self[feature] = value
+            else:
+                self._table.set(self._row, feature, value)
+
+    @property
+    def features(self) -> dict:
+        return self._table.row(self._row)
 
     def is_(self, feature: str) -> Optional[bool]:
         if not self.language.has_feature(feature):
             raise ValueError
 
     def get(self, name: str) -> Optional[bool] | str:  # todo think of returning an array of features in case of multiple feature allowance
-        if name in self.language.feature_description:
-            return self._features.get(name, None)
+        '''
+        A category gives the value stored for it, a value of a category whether it is the one stored
+        '''
         if name in self.language.feature_category:
-            possibles = self.language.feature_category[name]
-            return next((feature for feature in possibles if self.get(feature)), None)
+            return self._table.get(self._row, name)
+        if (category := self.language.value_category.get(name)) is not None:
+            return True if self._table.get(self._row, category) == name else None
+        if name in self.language.feature_description:
+            return self._table.get(self._row, name)
         raise ValueError
 
     def __getitem__(self, name) -> Optional[bool] | str:
         return self.get(name)
 
     def __setitem__(self, name, value) -> None:
+        '''
+        Setting a category stores its value under it, and the category itself as the value of the enclosing category
+        if there is one. Setting a value of a category to True selects it, to a falsy value unselects it
+        '''
+        value_category = self.language.value_category
         if name in self.language.feature_category:
-            possibles = self.language.feature_category[name]
-            if value not in possibles:
+            if value is not None and value_category.get(value) != name:
                 raise ValueError
-            self[value] = True
+            self._table.set(self._row, name, value)
+            while value is not None and (category := value_category.get(name)) is not None:
+                self._table.set(self._row, category, name)
+                name = category
+        elif (category := value_category.get(name)) is not None:
+            if value:
+                self[category] = name
+            elif self._table.get(self._row, category) == name:
+                self._table.set(self._row, category, None)
         elif name in self.language.feature_description:
-            self._features[name] = value
+            self._table.set(self._row, name, value)
         else:
             raise ValueError
 
@@ -0,0 +1,489 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Mapping
+from functools import reduce
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from src.constants import LangData
+from src.derivation import Derivation
+from src.exceptions import InvalidYamlException, Messages
+from src.language import Language
+from src.snippets import compile_snippet
+
+
+class Keys:
+    WHEN = 'when'
+    THEN = 'then'
+    IS = 'is'
+    NOT = 'not'
+    REGISTER = 'register'
+    NAME = 'name'
+    PYTHON = 'python'
+    ACTION = 'action'
+    ARGS = 'args'
+    REDUCE = 'reduce'
+    OP = 'op.'
+    MATCH = 'match'
+    FOR = 'for'
+    CASES = 'cases'
+    CASE = 'case'
+    MORPHEME = 'morpheme'
+    HAS = 'has'
+
+    VALUE_KEYS = (PYTHON, MATCH, ACTION)
+
+
+class Env:
+    '''
+    What a rule sees of a single morpheme: the names it registered, the features the rules set so far and the morpheme.
+    The namespace of the python snippets is built once per morpheme and kept up to date by the assignments
+    '''
+    __slots__ = ('name', 'kind', 'morpheme', 'outputs', 'registers', 'derivation', '_namespace')
+
+    def __init__(self, name: str, morpheme: dict, derivation: Optional[Derivation] = None, kind: str = Keys.MORPHEME):
+        self.name = name
+        self.kind = kind
+        self.morpheme = morpheme
+        self.outputs: dict[str, Any] = {}
+        self.registers: dict[str, Any] = {}
+        self.derivation = derivation
+        self._namespace: Optional[dict[str, Any]] = None
+
+    def get(self, key: str) -> Any:
+        for scope in (self.registers, self.outputs, self.morpheme):
+            if key in scope:
+                return scope[key]
+        return None
+
+    def namespace(self) -> dict[str, Any]:
+        if self._namespace is None:
+            self._namespace = {**self.morpheme, **self.outputs, **self.registers}
+        return self._namespace
+
+    def register(self, name: str, value: Any) -> None:
+        self.registers[name] = value
+        if self._namespace is not None:
+            self._namespace[name] = value
+
+    def output(self, name: str, value: Any) -> None:
+        self.outputs[name] = value
+        if self._namespace is not None and name not in self.registers:
+            self._namespace[name] = value
+
+
+Predicate = Callable[[Env], bool]
+Getter = Callable[[Env], Any]
+Step = Callable[[Env], bool]
+Guard = tuple[str, str]
+
+
+class CompiledRule:
+    '''
+    A rule turned into closures: the steps run in order and the rule stops at the first one returning False. Conditions
+    on the names the rule registers itself are checked right after the registration. reads and writes are the features
+    the rule looks at and sets, its own registered names excluded. guards are the conditions an index can answer:
+    (is, kind), (not, feature) and (has, feature) for a feature which has to have a truthy value. unguarded are the
+    steps left once the guards are known to hold
+    '''
+    __slots__ = ('feature', 'steps', 'reads', 'writes', 'registers', 'guards', 'unguarded')
+
+    def __init__(self, feature: str, steps: list[Step], reads: Iterable[str] = (), writes: Iterable[str] = (), registers: Iterable[str] = (), guards: Iterable[Guard] = (), unguarded: list[Step] = None):
+        self.feature = feature
+        self.steps = tuple(steps)
+        self.reads: frozenset[str] = frozenset(reads)
+        self.writes: frozenset[str] = frozenset(writes)
+        self.registers: frozenset[str] = frozenset(registers)
+        self.guards: tuple[Guard, ...] = tuple(guards)
+        self.unguarded = tuple(unguarded) if unguarded is not None else self.steps
+
+    def __call__(self, env: Env) -> bool:
+        for step in self.steps:
+            if not step(env):
+                return False
+        return True
+
+    def run_guarded(self, env: Env) -> bool:
+        '''
+        Runs the rule on an element its guards were checked for by an index
+        '''
+        for step in self.unguarded:
+            if not step(env):
+                return False
+        return True
+
+
+def iter_rules(rules: Mapping) -> Iterator[tuple[str, Any, str]]:
+    '''
+    Yields the feature, the spec and the error path of every rule, a feature may have a list of them
+    '''
+    for feature, specs in rules.items():
+        for i, spec in enumerate(specs if isinstance(specs, list) else [specs]):
+            yield str(feature), spec, f'{feature} > ' if not isinstance(specs, list) else f'{feature} > {i} > '
+
+
+def lookup_table(spec: Any) -> Optional[tuple[str, dict, Any]]:
+    '''
+    The feature, the case -> value table and the default of a match spec, a case without "case" is the default
+    '''
+    if not isinstance(spec, dict) or not isinstance(spec.get(Keys.FOR), str) or not isinstance(spec.get(Keys.CASES), list):
+        return None
+    table, default = {}, None
+    for case in spec[Keys.CASES]:
+        if not isinstance(case, dict) or Keys.THEN not in case or isinstance(case.get(Keys.CASE), (dict, list)):
+            return None
+        if Keys.CASE in case:
+            table.setdefault(case[Keys.CASE], case[Keys.THEN])
+        else:
+            default = case[Keys.THEN]
+    return spec[Keys.FOR], table, default
+
+
+def is_assignment(action: Any) -> bool:
+    '''
+    Whether a then action is a {feature: value} pair rather than a value for the feature of the rule
+    '''
+    return isinstance(action, dict) and len(action) == 1 and next(iter(action)) not in Keys.VALUE_KEYS
+
+
+class RuleCompiler:
+    '''
+    Compiles the when/then rules of rules.yaml into closures once, every error is collected and raised at the end
+    '''
+    def __init__(self):
+        self.errors: list[InvalidYamlException] = []
+
+    def compile(self, rules: Mapping) -> list[CompiledRule]:
+        self.errors = []
+        compiled = []
+        for feature, spec, path in iter_rules(rules):
+            if (rule := self._compile_rule(feature, spec, path)) is not None:
+                compiled.append(rule)
+        if self.errors:
+            raise InvalidYamlException(*self.errors[0].args, errors=self.errors)
+        return compiled
+
+    def _error(self, path: str, message: str) -> None:
+        self.errors.append(InvalidYamlException(path, message))
+
+    def _compile_rule(self, feature: str, spec: Any, path: str) -> Optional[CompiledRule]:
+        if not isinstance(spec, dict) or Keys.THEN not in spec:
+            self._error(path, Messages.LACK_OF_REQUIRED_FIELD % (feature, Keys.THEN))
+            return None
+        conditions = spec.get(Keys.WHEN) or []
+        conditions = conditions if isinstance(conditions, list) else [conditions]
+        actions = spec[Keys.THEN] if isinstance(spec[Keys.THEN], list) else [spec[Keys.THEN]]
+
+        registered = [self._registered_name(action) for action in actions]
+        registers = set(filter(None, registered))
+        predicates = [self._compile_condition(condition, f'{path}{Keys.WHEN} > ') for condition in conditions]
+        pending = list(zip(map(self._condition_names, conditions), predicates))
+        steps, known = [], set()
+
+        def ready() -> list[Step]:
+            names = set(filter(None, registered)) - known
+            checkable = [predicate for names_used, predicate in pending if predicate is not None and not names_used & names]
+            pending[:] = [(names_used, predicate) for names_used, predicate in pending if names_used & names]
+            return checkable
+
+        steps += ready()
+        for action, name in zip(actions, registered):
+            if (step := self._compile_action(feature, action, f'{path}{Keys.THEN} > ')) is not None:
+                steps.append(step)
+            known.add(name)
+            steps += ready()
+        reads = set().union(*map(self._condition_names, conditions), *(self._value_names(action) for action in actions))
+        writes = {next(iter(action)) if is_assignment(action) else feature for action, name in zip(actions, registered) if name is None}
+        guards, answered = [], []
+        for condition, predicate in zip(conditions, predicates):
+            if not self._condition_names(condition) & registers and (guard := self._guard(condition)) is not None:
+                guards.append(guard[0])
+                answered += [predicate] if guard[1] else []
+        unguarded = [step for step in steps if not any(step is predicate for predicate in answered)]
+        return CompiledRule(feature, steps, reads - registers, writes, registers, guards, unguarded)
+
+    @staticmethod
+    def _guard(condition: Any) -> Optional[tuple[Guard, bool]]:
+        '''
+        The guard of a condition and whether it answers the condition exactly
+        '''
+        if isinstance(condition, str):
+            return (Keys.HAS, condition), True
+        if isinstance(condition, dict) and len(condition) == 1:
+            key, value = next(iter(condition.items()))
+            if key in (Keys.IS, Keys.NOT):
+                return ((key, value), True) if isinstance(value, str) else None
+            return ((Keys.HAS, key), False) if value else None
+        return None
+
+    @classmethod
+    def _value_names(cls, spec: Any) -> set[str]:
+        if isinstance(spec, str):
+            return {spec[len(LangData.COMPOUND) + 1:] if spec.startswith(f'{LangData.COMPOUND}.') else spec}
+        if not isinstance(spec, dict):
+            return set()
+        if Keys.REGISTER in spec:
+            return cls._value_names(spec[Keys.REGISTER])
+        if Keys.PYTHON in spec:
+            try:
+                return set(compile_snippet(spec[Keys.PYTHON]).names)
+            except SyntaxError:
+                return set()
+        if Keys.MATCH in spec:
+            return {parsed[0]} if (parsed := lookup_table(spec[Keys.MATCH])) is not None else set()
+        if Keys.ACTION in spec:
+            return set().union(*(cls._value_names(arg) for arg in (spec.get(Keys.ARGS) or [])[1:]))
+        return set().union(*map(cls._value_names, spec.values())) if is_assignment(spec) else set()
+
+    @staticmethod
+    def _registered_name(action: Any) -> Optional[str]:
+        if isinstance(action, dict) and isinstance(action.get(Keys.REGISTER), dict):
+            return action[Keys.REGISTER].get(Keys.NAME)
+        return None
+
+    @staticmethod
+    def _condition_names(condition: Any) -> set[str]:
+        if isinstance(condition, str):
+            return {condition}
+        if isinstance(condition, dict) and len(condition) == 1:
+            key, value = next(iter(condition.items()))
+            return {value} if key == Keys.NOT and isinstance(value, str) else {key} if key != Keys.IS else set()
+        return set()
+
+    def _compile_condition(self, condition: Any, path: str) -> Optional[Predicate]:
+        if isinstance(condition, str):
+            # a bare name asks for a value, an empty one like "" from a register does not count
+            return lambda env: bool(env.get(condition))
+        if isinstance(condition, dict) and len(condition) == 1:
+            key, value = next(iter(condition.items()))
+            match key:
+                case Keys.IS: return lambda env: env.kind == value
+                case Keys.NOT: return lambda env: env.get(value) is None
+                case _: return lambda env: env.get(key) == value
+        self._error(path, Messages.UNKNOWN_CONDITION % (condition,))
+        return None
+
+    def _compile_action(self, feature: str, action: Any, path: str) -> Optional[Step]:
+        if isinstance(action, dict) and Keys.REGISTER in action:
+            spec = action[Keys.REGISTER]
+            if not isinstance(spec, dict) or Keys.NAME not in spec:
+                self._error(path, Messages.LACK_OF_REQUIRED_FIELD % (Keys.REGISTER, Keys.NAME))
+                return None
+            name = spec[Keys.NAME]
+            getter = self._compile_value({key: value for key, value in spec.items() if key != Keys.NAME}, f'{path}{Keys.REGISTER} > ')
+            return self._assigning(Env.register, name, getter)
+        if is_assignment(action):
+            target, spec = next(iter(action.items()))
+            return self._assigning(Env.output, target, self._compile_value(spec, f'{path}{target} > '))
+        return self._assigning(Env.output, feature, self._compile_value(action, path))
+
+    @staticmethod
+    def _assigning(setter: Callable[[Env, str, Any], None], name: str, getter: Optional[Getter]) -> Optional[Step]:
+        if getter is None:
+            return None
+
+        def assign(env: Env) -> bool:
+            setter(env, name, getter(env))
+            return True
+        return assign
+
+    def _compile_value(self, spec: Any, path: str) -> Optional[Getter]:
+        if isinstance(spec, str):
+            return self._compile_reference(spec)
+        if isinstance(spec, dict) and Keys.PYTHON in spec:
+            return self._compile_python(spec[Keys.PYTHON], path)
+        if isinstance(spec, dict) and spec.get(Keys.ACTION) == Keys.REDUCE:
+            return self._compile_reduce(spec.get(Keys.ARGS) or [], path)
+        if isinstance(spec, dict) and Keys.MATCH in spec:
+            return self._compile_match(spec[Keys.MATCH], path)
+        if not isinstance(spec, (dict, list)):
+            return lambda env: spec
+        self._error(path, Messages.UNKNOWN_ACTION % (spec,))
+        return None
+
+    @staticmethod
+    def _compile_reference(reference: str) -> Getter:
+        prefix = f'{LangData.COMPOUND}.'
+        if not reference.startswith(prefix):
+            return lambda env: env.get(reference)
+        feature = reference[len(prefix):]
+
+        def derived(env: Env) -> Any:
+            if env.derivation is None or not env.derivation.graph.is_compound(env.name):
+                return None
+            return env.derivation.derive(env.name, feature)
+        return derived
+
+    def _compile_reduce(self, args: list, path: str) -> Optional[Getter]:
+        if len(args) != 2 or not isinstance(args[0], str) or not args[0].startswith(Keys.OP) or not hasattr(operator, args[0][len(Keys.OP):]):
+            self._error(path, Messages.UNKNOWN_ACTION % (args,))
+            return None
+        function, values = getattr(operator, args[0][len(Keys.OP):]), self._compile_value(args[1], path)
+        if values is None:
+            return None
+
+        def reduced(env: Env) -> Any:
+            collection = values(env)
+            return reduce(function, collection) if collection else None
+        return reduced
+
+    def _compile_match(self, spec: Any, path: str) -> Optional[Getter]:
+        if (parsed := lookup_table(spec)) is None:
+            self._error(path, Messages.UNKNOWN_ACTION % ({Keys.MATCH: spec},))
+            return None
+        feature, table, default = parsed
+
+        def matched(env: Env) -> Any:
+            value = env.get(feature)
+            return table.get(value, default) if value.__hash__ is not None else default
+        return matched
+
+    def _compile_python(self, source: str, path: str) -> Optional[Getter]:
+        try:
+            snippet = compile_snippet(source)
+        except SyntaxError as e:
+            self._error(path, Messages.INVALID_PYTHON % e.msg)
+            return None
+        return lambda env: snippet(env.namespace())
+
+
+def schedule(rules: list[CompiledRule]) -> list[list[int]]:
+    '''
+    Groups the rules into waves: a rule comes after every rule setting or registering a name it reads and, in the order
+    of the file, after the rules setting the same one, whether it reads it or not, e.g. the fallbacks of a feature. The
+    rules of a wave are independent of each other
+    '''
+    writers: dict[str, list[int]] = {}
+    for i, rule in enumerate(rules):
+        for name in rule.writes | rule.registers:
+            writers.setdefault(name, []).append(i)
+    dependencies = [set() for _ in rules]
+    for i, rule in enumerate(rules):
+        written = rule.writes | rule.registers
+        dependencies[i].update(j for name in rule.reads - written for j in writers.get(name, ()) if j != i)
+        dependencies[i].update(j for name in written for j in writers[name] if j < i)
+
+    waves, done = [], set()
+    while len(done) < len(rules):
+        wave = [i for i in range(len(rules)) if i not in done and dependencies[i] <= done]
+        if not wave:
+            cycle = _find_cycle(dependencies, done)
+            raise InvalidYamlException(f'{rules[cycle[0]].feature} > ', Messages.RULE_CYCLE % ' > '.join(rules[i].feature for i in cycle))
+        waves.append(wave)
+        done.update(wave)
+    return waves
+
+
+def _find_cycle(dependencies: list[set[int]], done: set[int]) -> list[int]:
+    path, current = [], next(i for i in range(len(dependencies)) if i not in done)
+    while current not in path:
+        path.append(current)
+        current = min(dependencies[current] - done)
+    return path[path.index(current):] + [current]
+
+
+class RuleIndex:
+    '''
+    Inverted indexes from the kind of an element, the features it has a truthy value for and the ones it lacks to the ids
+    of the elements, so a rule only visits the elements its guards let through. The indexes the guards need are built
+    in one pass and updated as the rules set features. A compound is an element having the compound feature
+    '''
+    def __init__(self, elements: Mapping[str, dict], guards: Iterable[Guard] = (), kind: str = Keys.MORPHEME):
+        self.names: list[str] = list(elements)
+        self.elements: list[dict] = [elements[name] for name in self.names]
+        self.envs: dict[int, Env] = {}
+        self.kinds: dict[str, set[int]] = {kind: set(range(len(self.names)))}
+        self.having: dict[str, set[int]] = {}
+        self.lacking: dict[str, set[int]] = {}
+        for op, feature in set(guards):
+            if op == Keys.NOT:
+                self.lacking[feature] = {element for element, values in enumerate(self.elements) if values.get(feature) is None}
+            elif op == Keys.HAS:
+                self.having[feature] = {element for element, values in enumerate(self.elements) if values.get(feature)}
+
+    def guarded(self, guard: Guard) -> set[int]:
+        op, value = guard
+        return self.kinds.get(value, set()) if op == Keys.IS else self.lacking[value] if op == Keys.NOT else self.having[value]
+
+    def candidates(self, rule: CompiledRule) -> Iterable[int]:
+        # a set of every element does not narrow anything down
+        sets = sorted((candidates for candidates in map(self.guarded, rule.guards) if len(candidates) < len(self.elements)), key=len)
+        return sorted(sets[0].intersection(*sets[1:])) if sets else range(len(self.elements))
+
+    def tracked(self, features: Iterable[str]) -> list[str]:
+        '''
+        The features among the given ones which have an index to keep up to date
+        '''
+        return [feature for feature in features if feature in self.having or feature in self.lacking]
+
+    def update(self, element: int, features: Iterable[str]) -> None:
+        env = self.envs[element]
+        for feature in features:
+            value = env.get(feature)
+            if feature in self.having:
+                (self.having[feature].add if value else self.having[feature].discard)(element)
+            if feature in self.lacking:
+                (self.lacking[feature].add if value is None else self.lacking[feature].discard)(element)
+
+
+class RuleSet:
+    '''
+    The compiled rules of a language, applied to every morpheme in waves of independent rules. A rule sees what the
+    rules of the previous waves set
+    '''
+    def __init__(self, rules: Mapping | Language):
+        self.rules: list[CompiledRule] = RuleCompiler().compile(rules.rules if isinstance(rules, Language) else rules)
+        self.waves: list[list[int]] = schedule(self.rules)
+        self.order: list[int] = [i for wave in self.waves for i in wave]
+        # the features the guards of the rules from a position on look at, only those need their index updated
+        self._guarded_from: list[frozenset[str]] = [frozenset()]
+        for i in reversed(self.order):
+            self._guarded_from.insert(0, self._guarded_from[0] | {value for op, value in self.rules[i].guards if op != Keys.IS})
+
+    def apply(self, name: str, morpheme: dict, derivation: Derivation = None) -> dict[str, Any]:
+        env = Env(name, morpheme, derivation)
+        for i in self.order:
+            self.rules[i](env)
+        return env.outputs
+
+    def apply_waves(self, morphemes: Mapping[str, dict] | Language, derivation: Derivation = None) -> dict[str, dict[str, Any]]:
+        '''
+        Like apply_all but rule by rule over all the morphemes, wave after wave. The rules of a wave are independent of
+        each other, they still run one after the other since compiled rules hold the GIL and cannot be pickled for other
+        processes. The names registered for a morpheme are kept for the later rules, as in apply
+        '''
+        if isinstance(morphemes, Language):
+            derivation = derivation if derivation is not None else Derivation(morphemes)
+            morphemes = morphemes.morphemes
+        outputs, registers = {name: {} for name in morphemes}, {name: {} for name in morphemes}
+
+        def run(rule: CompiledRule) -> None:
+            for name, morpheme in morphemes.items():
+                env = Env(name, morpheme, derivation)
+                env.outputs, env.registers = outputs[name], registers[name]
+                rule(env)
+
+        for wave in self.waves:
+            for i in wave:
+                run(self.rules[i])
+        return {name: features for name, features in outputs.items() if features}
+
+    def apply_all(self, morphemes: Mapping[str, dict] | Language, derivation: Derivation = None, names: Iterable[str] = None) -> dict[str, dict[str, Any]]:
+        '''
+        Returns the features set by the rules for every morpheme they set anything for. The rules run one after the other
+        over the candidates a RuleIndex gives them, which is the same as applying them to every morpheme in turn
+        '''
+        if isinstance(morphemes, Language):
+            derivation = derivation if derivation is not None else Derivation(morphemes)
+            morphemes = morphemes.morphemes
+        index = RuleIndex(morphemes if names is None else {name: morphemes[name] for name in names}, (guard for rule in self.rules for guard in rule.guards))
+        for position, rule in enumerate(map(self.rules.__getitem__, self.order)):
+            candidates = index.candidates(rule)
+            tracked = index.tracked((rule.writes | rule.registers) & self._guarded_from[position + 1])
+            for element in candidates:
+                if (env := index.envs.get(element)) is None:
+                    env = index.envs[element] = Env(index.names[element], index.elements[element], derivation)
+                rule.run_guarded(env)
+                if tracked:
+                    index.update(element, tracked)
+        return {index.names[element]: env.outputs for element, env in sorted(index.envs.items()) if env.outputs}
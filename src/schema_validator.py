@@ -1,108 +1,149 @@
-from types import NoneType
+from collections.abc import Mapping
+from typing import Any, Callable, Hashable, Iterable, Iterator
 
 from src.constants import LangData
 from src.exceptions import InvalidYamlException, Messages
-from src.language import Language
-
-from strictyaml import load, Map, Str, Int, Any, Seq, YAMLError, MapPattern, MapCombined, Optional, Bool
-
-general_schema = Map({
-
-})
-
-features_schema = Map({
-  ## nested recurrence as in deutsch features, but the features can have subfeatures
-})
-
-morpheme_schema = MapCombined(
-    {
-        Optional('bound'): Bool()
-    },
-    Str(),
-    Any()
-)
-
-graphemes_schema = Map({
-
-})
-
-morphemes_schema = MapPattern(Str(), morpheme_schema)
-
-
-rules_schema = Map({
-
-})
-
-
-lang_schema = Map({
-    'general': general_schema,
-    'features': features_schema,  # TODO: think if should be inside graphemes and morphemes
-    'graphemes': graphemes_schema,
-    'morphemes': morphemes_schema,
-    'rules': rules_schema,
-})
-
-#
-# class SchemaValidator:
-#     @classmethod
-#     def validate(cls, to_val: dict, kind: str = LangData.LANGUAGE) -> bool:
-#         return cls.get_validation(kind)(kind, to_val)
-#
-#     @classmethod
-#     def validate_dict(cls, curr_kind: str, to_val: dict, requireds=None, next_kind: str = None, **kwargs) -> bool:
-#         if isinstance(to_val, (str, NoneType)):
-#             return True
-#         cls._validate_dict_required(curr_kind, to_val, requireds)
-#         return cls._validate_dict_subfields(curr_kind, to_val, next_kind, **kwargs)
-#
-#     @classmethod
-#     def _validate_dict_required(cls, curr_kind: str, to_val: dict, requireds: tuple):
-#         if requireds:
-#             for req_to_val in requireds:
-#                 if req_to_val not in to_val:
-#                     raise InvalidYamlException(Messages.LACK_OF_REQUIRED_FIELD % (curr_kind, req_to_val))
-#         return True
-#
-#     @classmethod
-#     def _validate_dict_subfields(cls, curr_kind: str, to_val: dict, next_kind: str = None, **kwargs) -> bool:
-#         get_next_val = lambda name: cls.get_validation(next_kind) if next_kind else cls.get_validation(name)
-#         for name, elem in to_val.items():
-#             try:
-#                 get_next_val(name)(name, elem, **kwargs)
-#             except InvalidYamlException as iye:
-#                 raise InvalidYamlException(f'{curr_kind} > ', *iye.args)
-#         return True
-#
-#     @classmethod
-#     def get_validation(cls, kind: str) -> Callable[[dict | str, Any, ...], bool]:
-#         return getattr(cls, f'validate_{kind}', cls.validate_dict)
-#
-#     @classmethod
-#     def validate_language(cls, curr_kind: str, to_val: dict, **kwargs) -> bool:
-#         return cls.validate_dict(curr_kind, to_val, requireds=(LangData.MORPHEMES, ), **kwargs)
-#
-#     @classmethod
-#     def validate_morphemes(cls, curr_kind, to_val, **kwargs) -> bool:
-#         return cls.validate_dict(curr_kind, to_val, next_kind=LangData.MORPHEMES, **kwargs)
-#
-#     @classmethod
-#     def validate_morpheme(cls, curr_kind, to_val, **kwargs) -> bool:
-#         if to_val is None:
-#             raise InvalidYamlException(Messages.NOT_DEFINED % curr_kind)
-#         exclusives_with_form = (LangData.COMPOUND, )
-#         is_any_exclusives_with_form = any(map(to_val.__contains__, exclusives_with_form))
-#         is_form_in = LangData.FORM in to_val
-#
-#         if is_form_in and is_any_exclusives_with_form:
-#             raise InvalidYamlException(Messages.FORMING_KEYS_TOGETHER)
-#         if not is_form_in and not is_any_exclusives_with_form:
-#             raise InvalidYamlException(Messages.NO_FORMING_KEY)
-#         return True
-#
-#     @classmethod
-#     def validate_rules(cls, curr_kind, to_val, **kwargs) -> bool:
-#         return cls.validate_dict(curr_kind, to_val, next_kind=LangData.RULES, **kwargs)
-#
-#     @classmethod
-#     def validate_rule(cls, curr_kind, to_val, **kwargs) -> bool:
-#         return False
\ No newline at end of file
+
+_strictyaml_schemas = ('general_schema', 'features_schema', 'morpheme_schema', 'graphemes_schema', 'morphemes_schema', 'rules_schema', 'lang_schema')
+
+
+def _build_strictyaml_schemas() -> dict:
+    from strictyaml import Map, Str, Any, MapPattern, MapCombined, Optional, Bool
+
+    general_schema = Map({
+
+    })
+
+    features_schema = Map({
+      ## nested recurrence as in deutsch features, but the features can have subfeatures
+    })
+
+    morpheme_schema = MapCombined(
+        {
+            Optional('bound'): Bool()
+        },
+        Str(),
+        Any()
+    )
+
+    graphemes_schema = Map({
+
+    })
+
+    morphemes_schema = MapPattern(Str(), morpheme_schema)
+
+
+    rules_schema = Map({
+
+    })
+
+
+    lang_schema = Map({
+        'general': general_schema,
+        'features': features_schema,  # TODO: think if should be inside graphemes and morphemes
+        'graphemes': graphemes_schema,
+        'morphemes': morphemes_schema,
+        'rules': rules_schema,
+    })
+    return {name: schema for name, schema in locals().items() if name in _strictyaml_schemas}
+
+
+def __getattr__(name: str):
+    # strictyaml is slow to import, its schemas are only built when asked for
+    if name in _strictyaml_schemas:
+        globals().update(_build_strictyaml_schemas())
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+Check = Callable[[Hashable, Any, list[InvalidYamlException]], None]
+
+
+class SchemaValidator:
+    '''
+    Validates already parsed language data in a single pass. The rules are compiled once into closures and every error
+    is collected instead of stopping at the first one
+    '''
+    def __init__(self):
+        self._check_morpheme: Check = self._compile_morpheme(optionals={LangData.BOUND: bool}, forming_keys=LangData.FORMING_KEYS)
+        self._sections: dict[str, Check] = {
+            LangData.MORPHEMES: self._compile_pattern(self._check_morpheme),
+        }
+
+    @staticmethod
+    def _compile_morpheme(optionals: dict[str, type], forming_keys: tuple[str, ...]) -> Check:
+        typed = tuple(optionals.items())
+
+        def check(name: Hashable, morpheme: Any, errors: list[InvalidYamlException]) -> None:
+            if morpheme is None:
+                errors.append(InvalidYamlException(f'{name} > ', Messages.NOT_DEFINED % name))
+                return
+            if not isinstance(morpheme, dict):
+                errors.append(InvalidYamlException(f'{name} > ', Messages.WRONG_TYPE % (name, 'a mapping')))
+                return
+            for key, kind in typed:
+                if key in morpheme and not isinstance(morpheme[key], kind):
+                    errors.append(InvalidYamlException(f'{name} > {key} > ', Messages.WRONG_TYPE % (key, kind.__name__)))
+            forming_count = sum(key in morpheme for key in forming_keys)
+            if forming_count > 1:
+                errors.append(InvalidYamlException(f'{name} > ', Messages.FORMING_KEYS_TOGETHER))
+            elif not forming_count:
+                errors.append(InvalidYamlException(f'{name} > ', Messages.NO_FORMING_KEY))
+        return check
+
+    @staticmethod
+    def _compile_pattern(check_entry: Check) -> Check:
+        def check(section: Hashable, entries: Any, errors: list[InvalidYamlException]) -> None:
+            if entries is None:
+                return
+            if not isinstance(entries, Mapping):
+                errors.append(InvalidYamlException(f'{section} > ', Messages.WRONG_TYPE % (section, 'a mapping')))
+                return
+            for name, entry in entries.items():
+                check_entry(name, entry, errors)
+        return check
+
+    def validate(self, lang_data: Mapping) -> list[InvalidYamlException]:
+        errors = []
+        for section, check in self._sections.items():
+            if section in lang_data:
+                check(section, lang_data[section], errors)
+        return errors
+
+    def check(self, lang_data: Mapping) -> bool:
+        self.raise_for(self.validate(lang_data))
+        return True
+
+    def validated_morphemes(self, morphemes: Iterable[tuple[str, dict]]) -> Iterator[tuple[str, dict]]:
+        '''
+        Checks a stream on its way through, the collected errors are raised once the stream is exhausted
+        '''
+        errors = []
+        for name, morpheme in morphemes:
+            self._check_morpheme(name, morpheme, errors)
+            yield name, morpheme
+        self.raise_for(errors)
+
+    @staticmethod
+    def raise_for(errors: list[InvalidYamlException]) -> None:
+        if errors:
+            raise InvalidYamlException(*errors[0].args, errors=errors)
+
+
+_validator = SchemaValidator()
+
+
+def validate_morpheme(name: str, morpheme: dict) -> bool:
+    return _validator.check({LangData.MORPHEMES: {name: morpheme}})
+
+
+def validated_morphemes(morphemes: Mapping | Iterable[tuple[str, dict]]) -> Iterator[tuple[str, dict]]:
+    return _validator.validated_morphemes(morphemes.items() if isinstance(morphemes, Mapping) else morphemes)
+
+
+def validate_morphemes(morphemes: Mapping | Iterable[tuple[str, dict]]) -> bool:
+    if isinstance(morphemes, Mapping):
+        return _validator.check({LangData.MORPHEMES: morphemes})
+    for _ in validated_morphemes(morphemes):
+        pass
+    return True
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Mapping, Optional
+
+Segment = str | tuple[str, int]
+
+_END = ''  # the key of a trie node where a grapheme ends, no character is empty
+
+
+class Segmenter:
+    '''
+    Splits words into the graphemes of an inventory, compiled once into a trie. At every position the longest grapheme
+    wins, e.g. "ei" over "e", and the characters no grapheme starts with are gathered into missing segments
+    '''
+    def __init__(self, basics: Iterable[str]):
+        self.basics: frozenset[str] = frozenset(basic for basic in basics if basic)
+        self.longest: int = max(map(len, self.basics), default=0)
+        self._root: dict = {}
+        for basic in self.basics:
+            node = self._root
+            for char in basic:
+                node = node.setdefault(char, {})
+            node[_END] = basic
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def of(basics: frozenset[str]) -> Segmenter:
+        return Segmenter(basics)
+
+    @classmethod
+    def from_graphemes(cls, graphemes: Mapping) -> Segmenter:
+        return cls.of(grapheme_inventory(graphemes))
+
+    def tokens(self, word: str) -> Iterator[tuple[str, int, bool]]:
+        '''
+        Every segment of the word with its index and whether it is a grapheme or a missing one
+        '''
+        root, size = self._root, len(word)
+        position, missing = 0, None
+        while position < size:
+            node, cursor, end = root, position, 0
+            while cursor < size and (node := node.get(word[cursor])) is not None:
+                cursor += 1
+                if _END in node:
+                    end = cursor
+            if not end:
+                missing = position if missing is None else missing
+                position += 1
+                continue
+            if missing is not None:
+                yield word[missing:position], missing, False
+            missing = None
+            yield word[position:end], position, True
+            position = end
+        if missing is not None:
+            yield word[missing:], missing, False
+
+    def segment(self, word: str, skip_missing: bool = False, yield_index: bool = False, start_from_one: bool = False) -> Iterator[Segment]:
+        return _select(self.tokens(word), skip_missing, yield_index, start_from_one)
+
+    def segment_many(self, words: Iterable[str], skip_missing: bool = False, yield_index: bool = False, start_from_one: bool = False) -> list[list[Segment]]:
+        '''
+        The segments of every word of a lexicon, in order
+        '''
+        return [list(self.segment(word, skip_missing, yield_index, start_from_one)) for word in words]
+
+
+def _select(tokens: Iterable[tuple[str, int, bool]], skip_missing: bool, yield_index: bool, start_from_one: bool) -> Iterator[Segment]:
+    offset = 1 if start_from_one else 0
+    for segment, index, is_known in tokens:
+        if is_known or not skip_missing:
+            yield (segment, index + offset) if yield_index else segment
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+
+class SegmentationCache:
+    '''
+    A bounded LRU cache of the segmentation of words by a segmenter, the least recently used word is evicted first.
+    An entry keeps the segments, their indexes and the positions of the graphemes among them, e.g. of the vowels for a
+    segmenter of the vowels, as three flat tuples: the usual calls return what is stored and a cache of many words does
+    not leave many small objects for the garbage collector to walk
+    '''
+    DEFAULT_MAXSIZE = 2 ** 16
+
+    def __init__(self, segmenter: Segmenter, maxsize: int = DEFAULT_MAXSIZE):
+        self.segmenter = segmenter
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[tuple[str, ...], tuple[int, ...], tuple[int, ...]]] = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, word: str) -> tuple[tuple[str, ...], tuple[int, ...], tuple[int, ...]]:
+        if (entry := self._entries.get(word)) is not None:
+            self.hits += 1
+            self._entries.move_to_end(word)
+            return entry
+        self.misses += 1
+        tokens = tuple(self.segmenter.tokens(word))
+        entry = self._entries[word] = tuple(segment for segment, _, _ in tokens), tuple(index for _, index, _ in tokens), tuple(index for _, index, is_known in tokens if is_known)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def tokens(self, word: str) -> Iterator[tuple[str, int, bool]]:
+        segments, indexes, positions = self._entry(word)
+        known = set(positions)
+        return ((segment, index, index in known) for segment, index in zip(segments, indexes))
+
+    def segment(self, word: str, skip_missing: bool = False, yield_index: bool = False, start_from_one: bool = False) -> Iterable[Segment]:
+        if not skip_missing and not yield_index:
+            return self._entry(word)[0]
+        return _select(self.tokens(word), skip_missing, yield_index, start_from_one)
+
+    def positions(self, word: str) -> tuple[int, ...]:
+        '''
+        The indexes of the graphemes of the segmenter in the word, the missing segments left out
+        '''
+        return self._entry(word)[2]
+
+    def span(self, word: str, at: int) -> Optional[tuple[int, int]]:
+        '''
+        The index and the size of the grapheme at a position among the graphemes of the word, counted from the end when
+        negative, None when there are not so many
+        '''
+        segments, indexes, positions = self._entry(word)
+        if not 0 < abs(at) <= len(positions):
+            return None
+        index = positions[at - 1 if at > 0 else at]
+        return index, len(segments[bisect_left(indexes, index)])
+
+    def resize(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, segmenter: Optional[Segmenter] = None) -> None:
+        '''
+        Drops every entry, for when the grapheme inventory changed, optionally with the segmenter of the new one
+        '''
+        self._entries.clear()
+        self.segmenter = segmenter if segmenter is not None else self.segmenter
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.maxsize)
+
+
+class _Tokens:
+    '''
+    The segmentation of a word by one segmenter: where every segment starts, whether it is a grapheme, and which
+    segments are the graphemes, so the nth grapheme is found by indexing
+    '''
+    __slots__ = ('starts', 'known', 'graphemes')
+
+    def __init__(self, starts: tuple[int, ...], known: tuple[bool, ...]):
+        self.starts = starts
+        self.known = known
+        self.graphemes: tuple[int, ...] = tuple(i for i, is_known in enumerate(known) if is_known)
+
+    @classmethod
+    def of(cls, segmenter: Segmenter, text: str) -> _Tokens:
+        tokens = list(segmenter.tokens(text))
+        return cls(tuple(index for _, index, _ in tokens), tuple(is_known for _, _, is_known in tokens))
+
+    def splice(self, segmenter: Segmenter, text: str, start: int, end: int, inserted: int) -> _Tokens:
+        '''
+        The segmentation of the word once text[start:end] of the old one got replaced with inserted characters, text
+        being the new word. Only the part from the first segment the change can affect to the first segment boundary it
+        shares with the old segmentation is segmented again, the rest is kept and shifted
+        '''
+        starts, known, delta = self.starts, self.known, inserted - (end - start)
+        # a grapheme starting within reach of the change may now be longer, a missing run may now merge with new ones
+        first = min(bisect_left(starts, start - segmenter.longest + 1), max(bisect_right(starts, start) - 1, 0))
+        first -= 1 if first > 0 and not known[first - 1] else 0
+        begin = starts[first] if first < len(starts) else 0
+        new_starts, new_known, rest = list(starts[:first]), list(known[:first]), len(starts)
+        for _, index, is_known in segmenter.tokens(text[begin:]):
+            index += begin
+            if index >= start + inserted:
+                old = bisect_left(starts, index - delta, lo=first)
+                if old < len(starts) and starts[old] == index - delta and starts[old] >= end:
+                    rest = old
+                    break
+            new_starts.append(index)
+            new_known.append(is_known)
+        new_starts.extend(index + delta for index in starts[rest:])
+        new_known.extend(known[rest:])
+        return _Tokens(tuple(new_starts), tuple(new_known))
+
+
+class SegmentedWord:
+    '''
+    A word with the segmentation of every step class it was given a segmenter for, e.g. the vowels, so the nth
+    grapheme of a class, counted from the start or from the end when negative, is found by indexing. Editing it
+    gives a new segmented word which only segments the changed part again
+    '''
+    __slots__ = ('text', 'classes', '_tokens')
+
+    def __init__(self, text: str, classes: Mapping[str, Segmenter] = None, _tokens: dict[str, _Tokens] = None):
+        self.text = text
+        self.classes: Mapping[str, Segmenter] = classes if classes is not None else {}
+        self._tokens: dict[str, _Tokens] = _tokens if _tokens is not None else {by: _Tokens.of(segmenter, text) for by, segmenter in self.classes.items()}
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f'SegmentedWord({self.text!r}, {sorted(self.classes)})'
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SegmentedWord) and self.text == other.text and self.classes == other.classes
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def segments(self, by: str) -> list[str]:
+        tokens, text = self._tokens[by], self.text
+        return [text[start:end] for start, end in zip(tokens.starts, (*tokens.starts[1:], len(text)))]
+
+    def positions(self, by: str) -> list[tuple[int, int]]:
+        '''
+        The index and the size of every grapheme of the class
+        '''
+        return [self._span(self._tokens[by], i) for i in self._tokens[by].graphemes]
+
+    def _span(self, tokens: _Tokens, i: int) -> tuple[int, int]:
+        end = tokens.starts[i + 1] if i + 1 < len(tokens.starts) else len(self.text)
+        return tokens.starts[i], end - tokens.starts[i]
+
+    def locate(self, at: int, by: Optional[str] = None) -> Optional[tuple[int, int]]:
+        '''
+        The index and the size of the grapheme at a position, counted by letters without a class, None when the word
+        is too short for it, a position more than one past the end is a ValueError
+        '''
+        if by is None:
+            index = at - 1 if at > 0 else len(self.text) + at if at < 0 else len(self.text)
+            found = (index, 1) if 0 <= index < len(self.text) else None
+        else:
+            tokens = self._tokens[by]
+            found = self._span(tokens, tokens.graphemes[at - 1 if at > 0 else at]) if 0 < abs(at) <= len(tokens.graphemes) else None
+        if found is None and abs(at) > len(self.text) + 1:
+            raise ValueError
+        return found
+
+    def splice(self, start: int, end: int, replacement: str) -> SegmentedWord:
+        text = self.text[:start] + replacement + self.text[end:]
+        tokens = {by: self._tokens[by].splice(self.classes[by], text, start, end, len(replacement)) for by in self._tokens}
+        return SegmentedWord(text, self.classes, tokens)
+
+
+def grapheme_inventory(graphemes: Mapping) -> frozenset[str]:
+    '''
+    The graphemes listed in a graphemes.yaml, under the list of every script or the top level List of a language
+    '''
+    inventory, pending = set(), [graphemes]
+    while pending:
+        entries = pending.pop()
+        for key, value in entries.items():
+            if isinstance(key, str) and key.lower() == 'list':
+                inventory.update(value if isinstance(value, list) else value or ())
+            elif isinstance(value, Mapping):
+                pending.append(value)
+    return frozenset(grapheme for grapheme in inventory if isinstance(grapheme, str))
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from src.language import Language
+from src.loaders import IPath, YamlLoader
+
+
+@dataclass(frozen=True)
+class FileStamp:
+    size: int
+    mtime_ns: int
+    digest: str
+
+    @classmethod
+    def of(cls, path: Path, content: bytes) -> FileStamp:
+        stat = path.stat()
+        return cls(stat.st_size, stat.st_mtime_ns, hashlib.blake2b(content, digest_size=16).hexdigest())
+
+    def is_unchanged(self, path: Path) -> bool:
+        stat = path.stat()
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+@dataclass
+class Snapshot:
+    VERSION = 4
+
+    files: dict[str, tuple[FileStamp, Any]] = field(default_factory=dict)
+    language: Optional[Language] = None
+    version: int = VERSION
+
+
+class SnapshotCache(IPath):
+    '''
+    Keeps one pickled snapshot per language directory: the parsed content of every file, each keyed by its stamp,
+    and the language interpreted from them. Snapshots are trusted local data, never load them from a foreign source
+    '''
+    suffix = '.snapshot'
+
+    def get_snapshot_path(self, lang_path: Path) -> Path:
+        key = hashlib.blake2b(str(Path(lang_path).resolve()).encode(), digest_size=8).hexdigest()
+        return self.path / f'{Path(lang_path).name}-{key}{self.suffix}'
+
+    def read(self, lang_path: Path) -> Snapshot:
+        try:
+            with open(self.get_snapshot_path(lang_path), 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return Snapshot()
+        return snapshot if isinstance(snapshot, Snapshot) and snapshot.version == Snapshot.VERSION else Snapshot()
+
+    def write(self, lang_path: Path, snapshot: Snapshot) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        snapshot_path = self.get_snapshot_path(lang_path)
+        tmp_path = snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(snapshot_path)
+
+
+class CachedYamlLoader(YamlLoader):
+    '''
+    A file is taken from the snapshot when its size and mtime are unchanged or, failing that, when its content hash
+    is. Only the remaining files are parsed again
+    '''
+    def __init__(self, cache: SnapshotCache | str | Path, path: str | Path = '', autosave: bool = True, **kwargs):
+        super().__init__(path=path, **kwargs)
+        self.cache: SnapshotCache = cache if isinstance(cache, SnapshotCache) else SnapshotCache(cache)
+        self.autosave: bool = autosave
+        self.snapshot: Snapshot = Snapshot()
+        self.parsed: list[Path] = []
+        self.is_dirty: bool = False
+        self._restamped: bool = False
+        self._root: Path = Path()
+        self._visited: set[str] = set()
+
+    @property
+    def is_fresh(self) -> bool:
+        return not self.parsed and self._visited == set(self.snapshot.files)
+
+    def load(self, path: str | Path = None, **kwargs) -> dict:
+        self._root = Path(path) if path is not None else self.path
+        self.snapshot = self.cache.read(self._root)
+        self.parsed, self._visited, self._restamped = [], set(), False
+        data = super().load(path, **kwargs)
+        self.is_dirty = self._restamped or not self.is_fresh
+        if not self.is_fresh:
+            self.snapshot.files = {key: self.snapshot.files[key] for key in self._visited}
+            self.snapshot.language = None
+        if self.autosave and self.is_dirty:
+            self.save()
+        return data
+
+    def save(self, language: Language = None) -> None:
+        if language is not None:
+            self.snapshot.language = language
+        self.cache.write(self._root, self.snapshot)
+        self.is_dirty = False
+
+    def _load_file(self, path: Path) -> dict | list:
+        key = path.relative_to(self._root).as_posix() if path != self._root else path.name
+        self._visited.add(key)
+        stamp, data = self.snapshot.files.get(key, (None, None))
+        if stamp is not None and stamp.is_unchanged(path):
+            return data
+
+        content = path.read_bytes()
+        new_stamp = FileStamp.of(path, content)
+        if stamp is None or stamp.digest != new_stamp.digest:
+            data = self.parse(content)
+            self.parsed.append(path)
+        self._restamped = True
+        self.snapshot.files[key] = (new_stamp, data)
+        return data
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import textwrap
+from functools import cache
+from types import CodeType, FunctionType
+from typing import Any, Iterable, Mapping
+
+
+class Snippet:
+    '''
+    A python: snippet of a rule, compiled once. An expression is evaluated as it is, anything else is the body of a
+    function, so it may return. Names are looked up in the namespace given to the call
+    '''
+    _function_name = '_snippet'
+
+    def __init__(self, source: str):
+        self.source = source
+        self._expression: CodeType | None = None
+        self._body: CodeType | None = None
+        try:
+            self._expression = compile(source.strip(), '<python>', 'eval')
+        except SyntaxError:
+            module = compile(f'def {self._function_name}():\n{textwrap.indent(source, "    ")}', '<python>', 'exec')
+            self._body = next(const for const in module.co_consts if isinstance(const, CodeType))
+
+    @property
+    def names(self) -> frozenset[str]:
+        '''
+        The global names the snippet may read, attribute names included as the bytecode does not tell them apart
+        '''
+        names, pending = set(), [self._expression if self._expression is not None else self._body]
+        while pending:
+            code = pending.pop()
+            names.update(code.co_names)
+            pending.extend(const for const in code.co_consts if isinstance(const, CodeType))
+        return frozenset(names)
+
+    def __call__(self, namespace: dict[str, Any]) -> Any:
+        if self._expression is not None:
+            return eval(self._expression, namespace)
+        return FunctionType(self._body, namespace)()
+
+    def map(self, namespaces: Iterable[Mapping[str, Any]]) -> list[Any]:
+        '''
+        Runs the snippet once per namespace, all the runs share a single dict which is refilled every time
+        '''
+        results, namespace = [], {}
+        if self._expression is not None:
+            expression = self._expression
+            for values in namespaces:
+                namespace.clear()
+                namespace.update(values)
+                results.append(eval(expression, namespace))
+        else:
+            function = FunctionType(self._body, namespace)
+            for values in namespaces:
+                namespace.clear()
+                namespace.update(values)
+                results.append(function())
+        return results
+
+
+@cache
+def compile_snippet(source: str) -> Snippet:
+    return Snippet(source)
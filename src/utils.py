@@ -1,4 +1,29 @@
-from typing import Iterable, Callable, Any, Collection, Tuple
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Iterable, Iterator, Callable, Any, Collection, Tuple
+
+from src.segmentation import SegmentationCache, Segmenter
+
+
+def lazy_import(name: str) -> ModuleType:
+    '''
+    Returns the module without executing it, it is imported on the first attribute access. A submodule is set on its
+    package, as an import would, for code doing "import package.module" later
+    '''
+    if name in sys.modules:
+        return sys.modules[name]
+    parent, _, child = name.rpartition('.')
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    if parent:
+        setattr(importlib.import_module(parent), child, module)
+    return module
 
 
 def get_name(instance):
@@ -38,37 +63,13 @@ class DictClass:
         return cls.dict().items()
 
 
-def word_to_basics(word: str, basics: Collection[str], skip_missing=False, yield_index=False, start_from_one=False) -> Collection[str | Tuple[str, int] | None]:
-    basics = sorted(basics, reverse=True)
-    index = 1 if start_from_one else 0
-    missing = ''
-    while word:
-        first = word[0]
-        starting = next(filter(lambda b: b.startswith(first), basics), None)
-        if starting is None:
-            missing += first
-            word = word[1:]
-        else:
-            if missing:
-                if not skip_missing:
-                    if yield_index:
-                        yield missing, index
-                    else:
-                        yield missing
-                index += len(missing)
-                missing = ''
-            if yield_index:
-                yield starting, index
-                index += len(starting)
-            else:
-                yield starting
-            word = word[len(starting):]
-
-    if missing and not skip_missing:
-        if yield_index:
-            yield missing, index
-        else:
-            yield missing
+def word_to_basics(word: str, basics: Collection[str] | Segmenter | SegmentationCache, skip_missing=False, yield_index=False, start_from_one=False) -> Iterator[str | Tuple[str, int]]:
+    '''
+    Greedy longest-match segmentation of the word, the segmenter of the basics is compiled once. Given the segmentation
+    cache of a language, e.g. language.step_segmentation(By.VOWELS), a word segmented again is not split again
+    '''
+    segmenter = basics if isinstance(basics, (Segmenter, SegmentationCache)) else Segmenter.of(frozenset(basics))
+    return segmenter.segment(word, skip_missing=skip_missing, yield_index=yield_index, start_from_one=start_from_one)
 
 
 def get_extreme_points(col: list | str, midpoint: int, remove_range: int, right_remove_range: int = None) -> tuple[int, int]:
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.constants import LangData
+from src.derivation import Derivation
+from src.language import Language
+from src.rules import CompiledRule, Env, Keys, RuleCompiler, RuleSet, is_assignment, iter_rules, lookup_table
+from src.utils import lazy_import
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+np = lazy_import('numpy')
+
+Column = tuple['ndarray', 'ndarray']
+Mask = Callable[['FeatureColumns'], 'ndarray']
+Values = Callable[['FeatureColumns', 'ndarray'], Any]
+
+
+def _array(values: list) -> ndarray:
+    present = [value for value in values if value is not None]
+    for kind, dtype in ((bool, bool), (int, np.int64), (float, np.float64)):
+        if present and all(type(value) is kind for value in present):
+            return np.array([value if value is not None else kind() for value in values], dtype=dtype)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _truthy(values: ndarray) -> ndarray:
+    return values.astype(bool) if values.dtype != object else np.fromiter(map(bool, values), bool, len(values))
+
+
+class FeatureColumns:
+    '''
+    The features of a lexicon as columns: an array of values and a mask of the present ones per feature, built on first
+    use. The rule outputs are kept in columns of their own which shadow the features of the morphemes
+    '''
+    def __init__(self, morphemes: Mapping[str, dict]):
+        self.names: list[str] = list(morphemes)
+        self.rows: list[dict] = [morphemes[name] for name in self.names]
+        self.outputs: dict[str, Column] = {}
+        self._inputs: dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _input(self, feature: str) -> Column:
+        if feature not in self._inputs:
+            values = [row.get(feature) for row in self.rows]
+            self._inputs[feature] = _array(values), np.fromiter((value is not None for value in values), bool, len(values))
+        return self._inputs[feature]
+
+    def column(self, feature: str) -> Column:
+        values, present = self._input(feature)
+        if feature not in self.outputs:
+            return values, present
+        output, assigned = self.outputs[feature]
+        return np.where(assigned, output, values), np.where(assigned, np.not_equal(output, None), present)
+
+    def _output(self, feature: str) -> Column:
+        if feature not in self.outputs:
+            self.outputs[feature] = np.full(len(self), None, dtype=object), np.zeros(len(self), dtype=bool)
+        return self.outputs[feature]
+
+    def assign(self, feature: str, mask: ndarray, values: Any) -> None:
+        output, assigned = self._output(feature)
+        output[mask] = values
+        assigned |= mask
+
+    def set(self, feature: str, row: int, value: Any) -> None:
+        output, assigned = self._output(feature)
+        output[row] = value
+        assigned[row] = True
+
+    def row_outputs(self, row: int) -> dict[str, Any]:
+        return {feature: output[row] for feature, (output, assigned) in self.outputs.items() if assigned[row]}
+
+
+class VectorizedRuleSet:
+    '''
+    Applies the rules to whole columns at once: the conditions become boolean masks and copying, constant and match
+    (lookup table) assignments are done for all the matching rows together. Any other rule, e.g. one with python or a
+    compound reference, runs row by row as compiled by RuleSet, only for the rows its plain conditions let through
+    '''
+    def __init__(self, rules: Mapping | Language):
+        rules = rules.rules if isinstance(rules, Language) else rules
+        self.rule_set = RuleSet(rules)
+        self._plans: list[tuple[Optional[list[Mask]], Optional[list[tuple[str, Values]]], CompiledRule]] = []
+        for (feature, spec, _), compiled in zip(iter_rules(rules), self.rule_set.rules):
+            masks, is_complete = self._plan_conditions(spec)
+            is_vectorized = is_complete and not any(map(RuleCompiler._registered_name, self._actions_of(spec)))
+            self._plans.append((masks, self._plan_actions(feature, spec) if is_vectorized else None, compiled))
+
+    @property
+    def vectorized(self) -> list[bool]:
+        return [actions is not None for _, actions, _ in self._plans]
+
+    @staticmethod
+    def _actions_of(spec: dict) -> list:
+        return spec[Keys.THEN] if isinstance(spec[Keys.THEN], list) else [spec[Keys.THEN]]
+
+    def _plan_conditions(self, spec: dict) -> tuple[list[Mask], bool]:
+        '''
+        Masks of the conditions that do not depend on names registered by the rule and whether all of them have one
+        '''
+        conditions = spec.get(Keys.WHEN) or []
+        registered = set(filter(None, map(RuleCompiler._registered_name, self._actions_of(spec))))
+        conditions = conditions if isinstance(conditions, list) else [conditions]
+        masks = []
+        for condition in conditions:
+            if not RuleCompiler._condition_names(condition) & registered and (mask := self._mask(condition)) is not None:
+                masks.append(mask)
+        return masks, len(masks) == len(conditions)
+
+    @staticmethod
+    def _mask(condition: Any) -> Optional[Mask]:
+        if isinstance(condition, str):
+            def has(columns: FeatureColumns) -> ndarray:
+                values, present = columns.column(condition)
+                return present & _truthy(values)
+            return has
+        if not isinstance(condition, dict) or len(condition) != 1:
+            return None
+        key, value = next(iter(condition.items()))
+        match key:
+            case Keys.IS:
+                return lambda columns: np.full(len(columns), value == Keys.MORPHEME)
+            case Keys.NOT:
+                return lambda columns: ~columns.column(value)[1]
+            case _ if value is not None and not isinstance(value, (dict, list)):
+                def equal(columns: FeatureColumns) -> ndarray:
+                    values, present = columns.column(key)
+                    compared = np.asarray(values == value)
+                    return present & compared if compared.shape == present.shape else np.zeros(len(columns), dtype=bool)
+                return equal
+        return None
+
+    def _plan_actions(self, feature: str, spec: dict) -> Optional[list[tuple[str, Values]]]:
+        planned = []
+        for action in self._actions_of(spec):
+            target, value = next(iter(action.items())) if is_assignment(action) else (feature, action)
+            if (values := self._values(value)) is None:
+                return None
+            planned.append((target, values))
+        return planned
+
+    @staticmethod
+    def _values(spec: Any) -> Optional[Values]:
+        if isinstance(spec, str):
+            if spec.startswith(f'{LangData.COMPOUND}.'):
+                return None
+
+            def copied(columns: FeatureColumns, mask: ndarray) -> ndarray:
+                values, present = columns.column(spec)
+                copy = values[mask].astype(object)
+                copy[~present[mask]] = None
+                return copy
+            return copied
+        if isinstance(spec, dict) and Keys.MATCH in spec and (parsed := lookup_table(spec[Keys.MATCH])) is not None:
+            feature, table, default = parsed
+
+            def looked_up(columns: FeatureColumns, mask: ndarray) -> ndarray:
+                values, present = columns.column(feature)
+                values, present = values[mask], present[mask]
+                if values.dtype != object:
+                    uniques, inverse = np.unique(values, return_inverse=True)
+                    mapped = np.empty(len(uniques), dtype=object)
+                    mapped[:] = [table.get(unique.item(), default) for unique in uniques]
+                    result = mapped[inverse]
+                else:
+                    result = np.empty(len(values), dtype=object)
+                    result[:] = [table.get(value, default) if value.__hash__ is not None else default for value in values]
+                result[~present] = table.get(None, default)
+                return result
+            return looked_up
+        if not isinstance(spec, (dict, list)):
+            return lambda columns, mask: spec
+        return None
+
+    def apply_columns(self, columns: FeatureColumns, derivation: Derivation = None) -> FeatureColumns:
+        for conditions, actions, compiled in map(self._plans.__getitem__, self.rule_set.order):
+            mask = np.ones(len(columns), dtype=bool)
+            for condition in conditions:
+                mask &= condition(columns)
+            if actions is not None:
+                for target, values in actions:
+                    columns.assign(target, mask, values(columns, mask))
+            else:
+                self._apply_rows(compiled, columns, np.flatnonzero(mask), derivation)
+        return columns
+
+    @staticmethod
+    def _apply_rows(compiled: CompiledRule, columns: FeatureColumns, rows: ndarray, derivation: Optional[Derivation]) -> None:
+        for row in rows.tolist():
+            outputs = columns.row_outputs(row)
+            env = Env(columns.names[row], columns.rows[row], derivation)
+            env.outputs = dict(outputs)
+            compiled(env)
+            for feature, value in env.outputs.items():
+                if feature not in outputs or outputs[feature] is not value:
+                    columns.set(feature, row, value)
+
+    def apply_all(self, morphemes: Mapping[str, dict] | Language, derivation: Derivation = None) -> dict[str, dict[str, Any]]:
+        '''
+        The same result as RuleSet.apply_all
+        '''
+        if isinstance(morphemes, Language):
+            derivation = derivation if derivation is not None else Derivation(morphemes)
+            morphemes = morphemes.morphemes
+        columns = self.apply_columns(FeatureColumns(morphemes), derivation)
+        results: dict[str, dict[str, Any]] = {}
+        for feature, (output, assigned) in columns.outputs.items():
+            for row in np.flatnonzero(assigned).tolist():
+                results.setdefault(columns.names[row], {})[feature] = output[row]
+        return results
@@ -3,9 +3,41 @@ from typing import Iterable
 
 from tests.abstractTest import AbstractTest
 from tests.test_cases.loading_test import LoadingTest
+from tests.test_cases.snapshot_test import SnapshotTest
+from tests.test_cases.parallel_loading_test import ParallelLoadingTest
+from tests.test_cases.reload_test import ReloadTest
+from tests.test_cases.lazy_loading_test import LazyLoadingTest
+from tests.test_cases.streaming_test import StreamingTest
+from tests.test_cases.bulk_loading_test import BulkLoadingTest
+from tests.test_cases.schema_validator_test import SchemaValidatorTest
+from tests.test_cases.artifact_test import ArtifactTest
+from tests.test_cases.import_time_test import ImportTimeTest
+from tests.test_cases.derivation_test import DerivationTest
+from tests.test_cases.rules_test import RulesTest
+from tests.test_cases.vectorized_test import VectorizedTest
+from tests.test_cases.feature_table_test import FeatureTableTest
+from tests.test_cases.characteristic_test import CharacteristicTest
+from tests.test_cases.morpheme_batch_test import MorphemeBatchTest
+from tests.test_cases.segmentation_test import SegmentationTest
 
 all_tests = [
     LoadingTest,
+    SnapshotTest,
+    ParallelLoadingTest,
+    ReloadTest,
+    LazyLoadingTest,
+    StreamingTest,
+    BulkLoadingTest,
+    SchemaValidatorTest,
+    ArtifactTest,
+    ImportTimeTest,
+    DerivationTest,
+    RulesTest,
+    VectorizedTest,
+    FeatureTableTest,
+    CharacteristicTest,
+    MorphemeBatchTest,
+    SegmentationTest,
     #BasicMorphemeTest,
 ]
 
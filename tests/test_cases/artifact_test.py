@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from parameterized import parameterized
+
+from src.artifact import LanguageArtifact
+from src.exceptions import InvalidYamlException
+from src.lang_factory import LangFactory
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class ArtifactTest(AbstractLangCodeTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / 'lang.artifact'
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+        super().tearDown()
+
+    @parameterized.expand([
+        ('toki_pona', ),
+        ('simplified_chinese', ),
+        ('sandhi_less_chinese', ),
+        ('simple_sandhi_chinese', ),
+        ('chinese', ),
+    ])
+    def test_round_trip(self, lang_name: str):
+        lang = LangFactory(Paths.LANGUAGES, lang_name).load()
+        LanguageArtifact.compile(lang, self.path)
+        with LanguageArtifact.open(self.path) as artifact:
+            self.assertEqual(lang_name, artifact.name)
+            self.assertEqual(lang.morphemes, dict(artifact))
+
+    def test_compound_edges(self):
+        LanguageArtifact.compile({'a': {'form': 'a'}, 'b': {'form': 'b', 'tone': 2}, 'ab': {'compound': ['a', 'b', 'c']}}, self.path)
+        with LanguageArtifact.open(self.path) as artifact:
+            compound = artifact.compound(artifact.index('ab'))
+            self.assertEqual(['a', 'b'], [artifact.morpheme_name(i) for i in compound[:2]])
+            self.assertEqual(['a', 'b', 'c'], artifact['ab']['compound'])
+            self.assertEqual({'tone': 2}, artifact.features(artifact.index('b')))
+            self.assertNotIn('c', artifact)
+
+    @parameterized.expand([
+        ({1: {'form': 'a'}}, ),
+        ({'a': {'form': 1}}, ),
+        ({'a': {'form': 'a', True: 'b'}}, ),
+        ({'a': {'compound': ['b', 2]}}, ),
+    ])
+    def test_only_strings_are_names(self, morphemes: dict):
+        with self.assertRaises(InvalidYamlException) as context:
+            LanguageArtifact.compile(morphemes, self.path)
+        self.assertIn('has to be a string', context.exception.reason)
+        self.assertFalse(self.path.exists())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.exceptions import InvalidYamlException
+from src.lang_factory import LangFactory
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class BulkLoadingTest(AbstractLangCodeTest):
+    valid = {'chinese', 'sandhi_less_chinese', 'simple_sandhi_chinese', 'simplified_chinese', 'toki_pona'}
+    invalid = {'incompatible_chinese', 'only_compound'}
+
+    def test_discover(self):
+        self.assertEqual(sorted(self.valid | self.invalid), LangFactory.discover(Paths.LANGUAGES))
+
+    def test_load_all(self):
+        result = LangFactory.load_all(Paths.LANGUAGES, max_workers=2)
+        self.assertEqual(self.valid, result.languages.keys())
+        self.assertEqual(self.invalid, result.failures.keys())
+        self.assertEqual(self.valid | self.invalid, result.timings.keys())
+        self.assertTrue(all(isinstance(failure, InvalidYamlException) for failure in result.failures.values()))
+        self.assertEqual('toki_pona', result.languages['toki_pona'].name)
+
+    def test_load_all_with_shared_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            first = LangFactory.load_all(Paths.LANGUAGES, executor=executor)
+            second = LangFactory.load_all(Paths.LANGUAGES, executor=executor)
+        self.assertEqual(first.languages.keys(), second.languages.keys())
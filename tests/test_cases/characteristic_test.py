@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from src.morphemes_nd import Characteristic, Grapheme, Language, languages
+from tests.lang_code_test import AbstractLangCodeTest
+
+
+def feature(name: str, *values: Characteristic) -> Characteristic:
+    return Characteristic(name, [], values)
+
+
+class CharacteristicTest(AbstractLangCodeTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.language = Language('deutsch', [], [feature('geschlecht', feature('männlich'), feature('weiblich')), feature('fall', feature('nominativ'))])
+
+    def tearDown(self) -> None:
+        languages.forget(self.language)
+        super().tearDown()
+
+    def test_closure(self):
+        description = self.language.feature_description
+        self.assertEqual({'geschlecht', 'männlich', 'weiblich', 'fall', 'nominativ'}, set(description.closure))
+        self.assertIn('weiblich', description)
+        self.assertNotIn('deutsch', description)
+        self.assertEqual('geschlecht', description.parent_of('weiblich'))
+        self.assertEqual('deutsch', description.parent_of('fall'))
+        self.assertIsNone(description.parent_of('numerus'))
+
+    def test_features_are_added_incrementally(self):
+        self.language.add_feature(feature('numerus', feature('singular'), feature('plural')))
+        self.language.add_feature(feature('akkusativ'), 'fall')
+        self.assertTrue(self.language.has_feature('plural'))
+        self.assertEqual('fall', self.language.feature_description.parent_of('akkusativ'))
+        self.assertEqual(('nominativ', 'akkusativ'), self.language.feature_category['fall'])
+        self.assertEqual(('singular', 'plural'), self.language.feature_category['numerus'])
+        grapheme = Grapheme('a')
+        grapheme['fall'] = 'akkusativ'
+        self.assertEqual('akkusativ', grapheme['fall'])
+        with self.assertRaises(ValueError):
+            self.language.add_feature(feature('dual'), 'anzahl')
+
+    def test_category_values_are_stored_directly(self):
+        self.language.add_feature(feature('kasus', feature('objektfall', feature('akkusativ'), feature('dativ'))))
+        first, second = Grapheme('a', weiblich=True), Grapheme('b')
+        second['objektfall'] = 'dativ'
+        self.assertEqual(('weiblich', True, None), (first['geschlecht'], first['weiblich'], first['männlich']))
+        self.assertEqual(('dativ', 'objektfall'), (second['objektfall'], second['kasus']))
+        self.assertEqual(['weiblich', None], self.language.category_column('geschlecht'))
+        first['weiblich'] = False
+        self.assertEqual([None, None], self.language.category_column('geschlecht'))
+        with self.assertRaises(ValueError):
+            second['geschlecht'] = 'nominativ'
+
+    def test_names_are_unique(self):
+        with self.assertRaises(ValueError):
+            self.language.add_feature(feature('kasus', feature('fall')))
+        with self.assertRaises(ValueError):
+            self.language.add_feature(feature('weiblich'), 'fall')
+        self.assertIsNone(self.language.feature_description.find('kasus'))
+        self.assertEqual('nominativ', self.language.feature_description.find('fall')['nominativ'].name)
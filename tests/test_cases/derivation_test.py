@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from src.constants import LangData
+from src.derivation import CompoundGraph, Derivation, derived_features
+from src.exceptions import InvalidYamlException, Messages
+from src.lang_factory import LangFactory
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class DerivationTest(AbstractLangCodeTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.language = LangFactory(Paths.LANGUAGES, 'simple_sandhi_chinese').load()
+
+    def test_order_puts_components_first(self):
+        order = CompoundGraph(self.language.morphemes).order
+        self.assertLess(order.index('我女'), order.index('我想我女'))
+
+    def test_derived_features_come_from_rules(self):
+        self.assertEqual(['form', 'tone', 'toneless_pinyin'], derived_features(self.language.rules))
+
+    def test_derives_from_sub_compounds(self):
+        derivation = Derivation(self.language)
+        self.assertEqual('我想我女', derivation.derive('我想我女', 'form'))
+        self.assertEqual([3, 3, 3, 3], derivation.derive('我想我女', 'tone'))
+        self.assertEqual(['nü', 'ren'], derivation.derive('女人', 'toneless_pinyin'))
+
+    def test_shared_sub_compound_is_derived_once(self):
+        derivation = Derivation(self.language)
+        with mock.patch.object(derivation, '_combine', wraps=derivation._combine) as combine:
+            derivation.derive_all('tone')
+            derivation.derive('我想我女', 'tone')
+        self.assertEqual(len(derivation.graph.order), combine.call_count)
+
+    def test_cycle_is_reported_up_front(self):
+        with self.assertRaises(InvalidYamlException) as context:
+            Derivation({'a': {'compound': ['b']}, 'b': {'compound': ['c', 'a']}, 'c': {'form': 'c'}})
+        self.assertEqual(Messages.COMPOUND_CYCLE % 'a > b > a', context.exception.args[-1])
+
+    def test_undefined_component(self):
+        with self.assertRaises(InvalidYamlException) as context:
+            Derivation({'ab': {'compound': ['a', 'b']}, 'a': {'form': 'a'}})
+        self.assertEqual(Messages.NOT_DEFINED % 'b', context.exception.args[-1])
+
+    def test_change_re_derives_only_dependents(self):
+        derivation = Derivation(self.language)
+        list(derivation)
+        self.language.morphemes['女']['tone'] = 4
+        with mock.patch.object(derivation, '_combine', wraps=derivation._combine) as combine:
+            changes = derivation.update(['女'])
+        self.assertEqual({'我女', '我想女', '我想我女', '女人'}, changes.keys())
+        self.assertEqual({'tone': [3, 3, 3, 4]}, changes['我想我女'])
+        self.assertEqual(4 * len(derivation.features), combine.call_count)
+        self.assertEqual({'我女', '我想女', '女人'}, derivation.graph.dependents['女'])
+        self.assertEqual({}, derivation.update(['女']))
+
+    def test_update_reports_only_features_derived_before(self):
+        derivation = Derivation(self.language)
+        derivation.derive_all('tone')
+        self.language.morphemes['女']['tone'] = 4
+        self.language.morphemes['女女'] = {'compound': ['女', '女']}
+        changes = derivation.update(['女', '女女'])
+        self.assertEqual({
+            '我女': {'tone': [3, 4]},
+            '我想女': {'tone': [3, 3, 4]},
+            '我想我女': {'tone': [3, 3, 3, 4]},
+            '女人': {'tone': [4, 2]},
+            '女女': {LangData.FORM: '女女', 'tone': [4, 4], 'toneless_pinyin': ['nü', 'nü']},
+        }, changes)
+        self.assertEqual('我女', derivation.derive('我女', LangData.FORM))
+
+    def test_update_from_reload(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copytree(Paths.LANGUAGES / 'simple_sandhi_chinese', Path(tmp) / 'simple_sandhi_chinese')
+            morphemes_path = Path(tmp) / 'simple_sandhi_chinese' / 'morphemes.yaml'
+            lf = LangFactory(tmp, 'simple_sandhi_chinese')
+            derivation = Derivation(lf.load())
+            list(derivation)
+            content = morphemes_path.read_text(encoding='utf-8')
+            content = content.replace('女:\n  form: 女\n', '女:\n  form: 她\n').replace('男人:\n  compound: [男, 人]\n', '人男:\n  compound: [人, 男]\n')
+            morphemes_path.write_text(content, encoding='utf-8')
+            changes = derivation.update(lf.reload())
+
+        self.assertEqual('我想我她', changes['我想我女'][LangData.FORM])
+        self.assertEqual('她人', changes['女人'][LangData.FORM])
+        self.assertEqual({LangData.FORM: None, 'tone': None, 'toneless_pinyin': None}, changes['男人'])
+        self.assertEqual('人男', changes['人男'][LangData.FORM])
+        self.assertEqual({'我女', '我想女', '我想我女', '女人', '男人', '人男'}, changes.keys())
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import weakref
+
+from src.feature_table import FeatureTable
+from src.morphemes_nd import Characteristic, Grapheme, Language, languages
+from tests.lang_code_test import AbstractLangCodeTest
+
+
+class FeatureTableTest(AbstractLangCodeTest):
+    def setUp(self) -> None:
+        super().setUp()
+        feature = lambda name, *values: Characteristic(name, [], values)
+        self.language = Language('deutsch', [], [feature('vowel'), feature('tone'), feature('ipa'), feature('geschlecht', feature('männlich'), feature('weiblich'))])
+
+    def tearDown(self) -> None:
+        languages.forget(self.language)
+        super().tearDown()
+
+    def test_typed_columns(self):
+        table = FeatureTable()
+        first, second = table.add_row({'vowel': True, 'tone': 3, 'ipa': 'a'}), table.add_row({'ipa': 'a'})
+        self.assertEqual('b', table.column('vowel').values.typecode)
+        self.assertEqual('I', table.column('ipa').values.typecode)
+        self.assertEqual(['a'], table.strings)
+        self.assertEqual({'vowel': True, 'tone': 3, 'ipa': 'a'}, table.row(first))
+        self.assertEqual({'ipa': 'a'}, table.row(second))
+        self.assertIsNone(table.get(second, 'tone'))
+        self.assertEqual([first, second], list(table.rows('ipa')))
+
+    def test_mixed_types_and_removal(self):
+        table = FeatureTable()
+        row = table.add_row({'tone': 3})
+        table.set(table.add_row(), 'tone', 'neutral')
+        table.set(row, 'ipa', 'a')
+        table.set(row, 'ipa', None)
+        self.assertEqual([3, 'neutral'], [table.get(0, 'tone'), table.get(1, 'tone')])
+        self.assertEqual({'tone': 3}, table.row(row))
+
+    def test_featured_is_a_view(self):
+        grapheme = Grapheme('a', vowel=True, tone=3)
+        grapheme['ipa'] = 'a'
+        grapheme['geschlecht'] = 'weiblich'
+        self.assertIs(self.language.graphemes['a'], grapheme)
+        self.assertEqual({'vowel': True, 'tone': 3, 'ipa': 'a', 'geschlecht': 'weiblich'}, self.language.feature_table.row(0))
+        self.assertEqual((True, 3, 'weiblich'), (grapheme['vowel'], grapheme['tone'], grapheme['geschlecht']))
+        self.assertFalse(hasattr(grapheme, '_features'))
+
+    def test_featured_without_a_language_keeps_its_own_row(self):
+        languages.forget(self.language)
+        first, second = Grapheme('a', vowel=True), Grapheme('b', tone=3)
+        self.assertIsNone(first.language)
+        self.assertEqual(({'vowel': True}, {'tone': 3}), (first.features, second.features))
+        self.assertEqual((1, 1), (len(first._table), len(second._table)))
+        table = weakref.ref(first._table)
+        del first
+        self.assertIsNone(table())
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from parameterized import parameterized
+
+from tests.lang_code_test import AbstractLangCodeTest
+
+ROOT = Path(__file__).parents[2]
+
+
+class ImportTimeTest(AbstractLangCodeTest):
+    heavy_modules = ('numpy', 'yaml', 'strictyaml', 'parsimonious', 'multiprocessing')
+
+    def run_python(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    @parameterized.expand([
+        ('src', ),
+        ('src.lang_factory', ),
+        ('src.morphemes', ),
+        ('src.schema_validator', ),
+        ('src.artifact', ),
+        ('src.loaders', ),
+        ('src.rules', ),
+        ('src.vectorized', ),
+    ])
+    def test_heavy_dependencies_are_not_loaded(self, module: str):
+        code = f'import sys, types, {module}; print(*(m for m in {self.heavy_modules} if type(sys.modules.get(m)) is types.ModuleType))'
+        self.assertEqual('', self.run_python('-c', code).stdout.strip())
+
+    @parameterized.expand([
+        ('asyncio', ),
+        ('concurrent.futures; concurrent.futures.ThreadPoolExecutor', ),
+    ])
+    def test_lazy_modules_do_not_break_later_imports(self, code: str):
+        self.run_python('-c', f'import src.lang_factory, src.loaders, src.rules; import {code}')
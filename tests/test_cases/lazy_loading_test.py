@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from parameterized import parameterized
+
+from src.constants import LangData
+from src.loaders import LangDataLoader, LazyYamlMapping, YamlLoader
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class LazyLoadingTest(AbstractLangCodeTest):
+    @parameterized.expand([
+        ('toki_pona', ),
+        ('simplified_chinese', ),
+        ('sandhi_less_chinese', ),
+        ('simple_sandhi_chinese', ),
+        ('chinese', ),
+    ])
+    def test_same_data_as_yaml_loader(self, lang_name: str):
+        lazy = LangDataLoader(Paths.LANGUAGES, lang_name).load(lazy=True)
+        expected = YamlLoader().load(Paths.LANGUAGES / lang_name)
+        self.assertEqual(expected.keys(), lazy.keys())
+        self.assertEqual(expected, {section: dict(lazy[section]) for section in lazy})
+
+    def test_nothing_is_parsed_up_front(self):
+        lazy = LangDataLoader(Paths.LANGUAGES, 'simple_sandhi_chinese').load(lazy=True)
+        self.assertEqual(set(), lazy.parsed)
+        self.assertTrue(lazy[LangData.GENERAL]['characteristics']['sound_change'])
+        self.assertEqual({LangData.GENERAL}, lazy.parsed)
+
+    def test_morphemes_are_materialized_on_access(self):
+        lazy = LangDataLoader(Paths.LANGUAGES, 'simple_sandhi_chinese').load(lazy=True)
+        morphemes = lazy[LangData.MORPHEMES]
+        self.assertIn('我想我女', morphemes)
+        self.assertEqual(0, morphemes.materialized)
+        self.assertEqual(['我', '想', '我女'], morphemes['我想我女'][LangData.COMPOUND])
+        self.assertEqual(1, morphemes.materialized)
+
+    def test_aliases_and_closing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'morphemes.yaml'
+            path.write_text('a: &x {form: a}\nb: *x\nc: {form: c}\n', encoding='utf-8')
+            with LazyYamlMapping(path) as morphemes:
+                self.assertEqual({'form': 'a'}, morphemes['b'])
+                self.assertEqual(YamlLoader().load(path), dict(morphemes))
+            self.assertEqual(b'', morphemes._content)
+
+    def test_every_top_level_key_is_indexed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'morphemes.yaml'
+            path.write_text('walk:\n  form: walk\n-ing:\n  form: ing\n  bound: true\n?x: 1\n', encoding='utf-8')
+            with LazyYamlMapping(path) as morphemes:
+                self.assertEqual(['walk', '-ing', '?x'], list(morphemes))
+                self.assertEqual({'form': 'ing', 'bound': True}, morphemes['-ing'])
+                self.assertEqual(1, morphemes.materialized)
+                self.assertEqual(YamlLoader().load(path), dict(morphemes))
+            path.write_text('a: 1\n!!str b: 2\n', encoding='utf-8')
+            with LazyYamlMapping(path) as morphemes:
+                self.assertEqual({'a': 1, 'b': 2}, dict(morphemes))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from src.language import Language
+from src.morphemes import By, Postfix, Prefix, SimpleMorphemeND, Side, Suffix
+from tests.lang_code_test import AbstractLangCodeTest
+
+
+class MorphemeBatchTest(AbstractLangCodeTest):
+    words = ['', 'a', 'ab', 'abc', 'bacab', 'aaaa']
+
+    def test_same_as_per_call(self):
+        for morpheme in (SimpleMorphemeND('', 'x', at=2, side=Side.AFTER), SimpleMorphemeND('', 'x', at=3, side=Side.AT),
+                         SimpleMorphemeND('', 'yz', at=-2), SimpleMorphemeND('a', 'o', at=2), SimpleMorphemeND('ab', '', at=-1)):
+            self.assertEqual([morpheme(word) for word in self.words], morpheme.apply_many(self.words))
+
+    def test_stream(self):
+        prefix = SimpleMorphemeND('', 'pre', at=1)
+        results = prefix.iter_many(iter(self.words))
+        self.assertEqual('pre', next(results))
+        self.assertEqual(['prea', 'preab'], [next(results), next(results)])
+
+    def test_raises(self):
+        with self.assertRaises(ValueError):
+            SimpleMorphemeND('', 'x', at=4, raises=True).apply_many(['abc', 'a'])
+        self.assertEqual(['abcx', 'a'], SimpleMorphemeND('', 'x', at=4).apply_many(['abc', 'a']))
+
+    def test_from_the_end(self):
+        self.assertEqual(['en', 'laufen'], Suffix('en').apply_many(['', 'lauf']))
+        self.assertEqual('gelaufen', Prefix('ge')(Postfix('en')('lauf')))
+        self.assertEqual('abcx', SimpleMorphemeND('', 'x', at=-1).insert('abc'))
+        self.assertEqual('abxc', SimpleMorphemeND('', 'x', at=-1, side=Side.BEFORE).insert('abc'))
+        self.assertEqual('xabc', SimpleMorphemeND('', 'x', at=-4).insert('abc'))
+        self.assertEqual('oa', SimpleMorphemeND('aa', 'o', at=1).replace('aaa'))
+        self.assertEqual('ao', SimpleMorphemeND('aa', 'o', at=-1).replace('aaa'))
+        self.assertTrue(SimpleMorphemeND('', 'n', at=-1).is_present('laufen'))
+        self.assertFalse(SimpleMorphemeND('', 'x', at=-1).is_present('laufen'))
+
+    def test_from_the_end_raises(self):
+        with self.assertRaises(ValueError):
+            SimpleMorphemeND('', 'x', at=-5, raises=True)('abc')
+        self.assertEqual('abc', SimpleMorphemeND('', 'x', at=-5)('abc'))
+
+    def test_same_as_inverted(self):
+        for morpheme in (SimpleMorphemeND('', 'x', at=-2, side=Side.AT), SimpleMorphemeND('', 'yz', at=-3, side=Side.AFTER), SimpleMorphemeND('aa', 'b', at=-2)):
+            inverted = SimpleMorphemeND(morpheme.to_remove, morpheme.to_insert, at=morpheme.at, side=morpheme.side)
+            inverted.is_using_inversion = True
+            self.assertEqual([inverted(word) for word in self.words], morpheme.apply_many(self.words))
+
+    def test_inverse_is_cached(self):
+        suffix = Suffix('en')
+        self.assertIs(~suffix, ~suffix)
+        suffix.to_insert = 'st'
+        self.assertEqual('ts', (~suffix).to_insert)
+
+    def test_by_vowels(self):
+        self.assertEqual('xabc', SimpleMorphemeND('', 'x', at=1, by=By.VOWELS)('abc'))
+        self.assertEqual('lauxfen', SimpleMorphemeND('', 'x', at=-2, by=By.VOWELS)('laufen'))
+        self.assertEqual('läufen', SimpleMorphemeND('a', 'ä', at=-3, by=By.VOWELS).apply_many(['laufen'])[0])
+        self.assertEqual('laufex', SimpleMorphemeND('', 'x', at=-1, by=By.CONSONANTS, side=Side.AT)('laufen'))
+        self.assertEqual(['xlaufen', 'tt'], SimpleMorphemeND('', 'x', at=-4, by=By.VOWELS).apply_many(['laufen', 'tt']))
+        with self.assertRaises(ValueError):
+            SimpleMorphemeND('', 'x', at=-4, by=By.VOWELS, raises=True)('tt')
+
+    def test_step_members_of_a_language(self):
+        language = Language('test')
+        language.graphemes = {'latin': {'list': ['a', 'au', 'e', 'f', 'j', 'l', 'n']}}
+        self.assertEqual({'VOWELS': {'a', 'au', 'e'}, 'SEMIVOWELS': {'j'}, 'CONSONANTS': {'f', 'j', 'l', 'n'}}, language.step_members)
+        self.assertEqual(Language.general_step_members, Language('empty').step_members)
+
+    def test_cached_functions_follow_the_language(self):
+        language = Language('test')
+        language.graphemes = {'latin': {'list': ['a', 'au', 'e', 'f', 'l', 'n']}}
+        infix = SimpleMorphemeND('', 'x', at=1, by=By.VOWELS, side=Side.AFTER)
+        self.assertEqual('laxufen', infix('laufen'))
+        infix.language = language
+        self.assertEqual('lauxfen', infix('laufen'))
+        language.graphemes['latin']['list'].remove('au')
+        language.invalidate()
+        self.assertEqual(['laxufen'], infix.apply_many(['laufen']))
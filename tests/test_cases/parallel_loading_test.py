@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+from parameterized import parameterized
+
+from src.loaders import ParallelYamlLoader, YamlLoader, split_yaml
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class ParallelLoadingTest(AbstractLangCodeTest):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.executor.shutdown()
+        super().tearDownClass()
+
+    @parameterized.expand([
+        ('toki_pona', ),
+        ('simplified_chinese', ),
+        ('only_compound', ),
+        ('sandhi_less_chinese', ),
+        ('simple_sandhi_chinese', ),
+        ('chinese', ),
+    ])
+    def test_same_output_as_yaml_loader(self, lang_name: str):
+        expected = YamlLoader().load(Paths.LANGUAGES / lang_name)
+        actual = ParallelYamlLoader(chunk_size=16, executor=self.executor).load(Paths.LANGUAGES / lang_name)
+        self.assertEqual(expected, actual)
+
+    def test_split_between_top_level_keys(self):
+        content = (Paths.LANGUAGES / 'simple_sandhi_chinese' / 'morphemes.yaml').read_bytes()
+        chunks = split_yaml(content, 64)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(content, b''.join(chunks))
+        self.assertTrue(all(chunk[:1] not in b' \n' for chunk in chunks))
+
+    def test_top_level_sequence_is_not_split(self):
+        content = b'- a\n- b\n- c\n'
+        self.assertEqual([content], split_yaml(content, 1))
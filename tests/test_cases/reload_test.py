@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from src.constants import LangData
+from src.exceptions import InvalidYamlException
+from src.lang_factory import LangFactory
+from src.loaders import IncrementalYamlLoader, LangDataDiff
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class ReloadTest(AbstractLangCodeTest):
+    lang_name = 'simple_sandhi_chinese'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.languages = Path(self._tmp.name)
+        shutil.copytree(Paths.LANGUAGES / self.lang_name, self.languages / self.lang_name)
+        self.morphemes_path = self.languages / self.lang_name / 'morphemes.yaml'
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def edit(self, path: Path, old: str, new: str) -> None:
+        stat = path.stat()
+        path.write_text(path.read_text(encoding='utf-8').replace(old, new), encoding='utf-8')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_nothing_changed(self):
+        lf = LangFactory(self.languages, self.lang_name)
+        lf.load()
+        self.assertFalse(lf.reload())
+
+    def test_changed_added_and_removed_morphemes(self):
+        lf = LangFactory(self.languages, self.lang_name)
+        lang = lf.load()
+        self.edit(self.morphemes_path, '  toneless_pinyin: nü\n  tone: 3', '  toneless_pinyin: nü\n  tone: 4')
+        self.edit(self.morphemes_path, '男人:\n  compound: [男, 人]\n', '新:\n  form: 新\n')
+        diff = lf.reload()
+
+        self.assertEqual({LangData.MORPHEMES}, diff.sections)
+        self.assertEqual({'女'}, diff.changed[LangData.MORPHEMES].keys())
+        self.assertEqual({'新'}, diff.added[LangData.MORPHEMES].keys())
+        self.assertEqual({'男人'}, diff.removed[LangData.MORPHEMES].keys())
+        self.assertEqual(4, lang.morphemes['女']['tone'])
+        self.assertIn('新', lang.morphemes)
+        self.assertNotIn('男人', lang.morphemes)
+
+    def test_only_changed_entries_are_parsed(self):
+        loader = IncrementalYamlLoader()
+        loader.load(self.languages / self.lang_name)
+        self.edit(self.morphemes_path, 'toneless_pinyin: ren', 'toneless_pinyin: rén')
+        data = loader.load(self.languages / self.lang_name)
+        self.assertEqual(1, len(loader.parsed))
+        self.assertEqual('rén', data[LangData.MORPHEMES]['人']['toneless_pinyin'])
+        self.assertEqual(data, IncrementalYamlLoader().load(self.languages / self.lang_name))
+
+    def test_aliases_follow_their_anchor(self):
+        self.morphemes_path.write_text('a: &x {form: a}\nb: *x\nc: {form: c}\n', encoding='utf-8')
+        loader = IncrementalYamlLoader()
+        loader.load(self.languages / self.lang_name)
+        self.edit(self.morphemes_path, '{form: a}', '{form: á}')
+        data = loader.load(self.languages / self.lang_name)
+        self.assertEqual({'form': 'á'}, data[LangData.MORPHEMES]['b'])
+
+    def test_diff_of_non_mapping_section(self):
+        diff = LangDataDiff.between({'general': {'a': 1}}, {'general': {'a': 2}, 'list': [1]})
+        self.assertEqual({'a': 2}, diff.changed['general'])
+        self.assertEqual({None: [1]}, diff.added['list'])
+
+    def test_failed_reload_keeps_the_previous_data(self):
+        lf = LangFactory(self.languages, self.lang_name)
+        lang = lf.load()
+        self.edit(self.morphemes_path, '  toneless_pinyin: nü\n  tone: 3', '  toneless_pinyin: nü\n  tone: 4')
+        self.edit(self.morphemes_path, '男人:\n', '坏: 5\n男人:\n')
+        with self.assertRaises(InvalidYamlException):
+            lf.reload()
+        self.assertEqual(3, lang.morphemes['女']['tone'])
+
+        self.edit(self.morphemes_path, '坏: 5\n', '坏:\n  form: 坏\n')
+        diff = lf.reload()
+        self.assertEqual({'女'}, diff.changed[LangData.MORPHEMES].keys())
+        self.assertEqual({'坏'}, diff.added[LangData.MORPHEMES].keys())
+        self.assertEqual(4, lang.morphemes['女']['tone'])
+        self.assertIn('坏', lang.morphemes)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from src.exceptions import InvalidYamlException, Messages
+from src.lang_factory import LangFactory
+from src.rules import Env, RuleCompiler, RuleIndex, RuleSet
+from src.snippets import compile_snippet
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class RulesTest(AbstractLangCodeTest):
+    def apply_all(self, name: str) -> dict:
+        lf = LangFactory(Paths.LANGUAGES, name)
+        language = lf.load()
+        return lf.rules.apply_all(language)
+
+    def test_rules_are_compiled_on_load(self):
+        lf = LangFactory(Paths.LANGUAGES, 'simple_sandhi_chinese')
+        lf.load()
+        self.assertEqual(['tone', 'toneless_pinyin', 'pinyin'], [rule.feature for rule in lf.rules.rules])
+
+    def test_compound_features(self):
+        results = self.apply_all('simple_sandhi_chinese')
+        self.assertEqual({'tone': [3, 3, 3, 3], 'toneless_pinyin': ['wo', 'xiang', 'wo', 'nü']}, results['我想我女'])
+        self.assertEqual({'pinyin'}, results['女'].keys())
+
+    def test_condition_on_registered_name(self):
+        results = self.apply_all('simple_sandhi_chinese')
+        self.assertEqual({'pinyin': 'wˇo'}, results['我'])
+        self.assertNotIn('pinyin', results['我女'])
+
+    def test_reduce(self):
+        self.assertEqual({'pinyin': 'nǚrén'}, self.apply_all('sandhi_less_chinese')['女人'])
+
+    def test_conditions(self):
+        rule_set = RuleSet({'free_form': {'when': [{'is': 'morpheme'}, {'bound': False}, 'form'], 'then': 'form'}})
+        self.assertEqual({'free_form': 'a'}, rule_set.apply('a', {'form': 'a', 'bound': False}))
+        self.assertEqual({}, rule_set.apply('b', {'form': 'b', 'bound': True}))
+
+    def test_errors_are_reported_up_front(self):
+        with self.assertRaises(InvalidYamlException) as context:
+            RuleCompiler().compile({
+                'a': {'when': [{'is': 'morpheme', 'not': 'a'}], 'then': 'b'},
+                'b': [{'when': ['b']}, {'then': {'c': {'python': 'return ('}}}],
+                'c': {'then': {'action': 'reduce', 'args': ['op.nothing', 'compound.c']}},
+            })
+        self.assertEqual([
+            Messages.UNKNOWN_CONDITION % ({'is': 'morpheme', 'not': 'a'},),
+            Messages.LACK_OF_REQUIRED_FIELD % ('b', 'then'),
+            Messages.INVALID_PYTHON % "'(' was never closed",
+            Messages.UNKNOWN_ACTION % (['op.nothing', 'compound.c'],),
+        ], [error.args[-1] for error in context.exception.errors])
+
+    def test_snippets_are_cached_by_source(self):
+        source = 'match tone:\n  case 3: return "ˇ"\n  case _: return ""\n'
+        self.assertIs(compile_snippet(source), compile_snippet(source))
+        self.assertEqual(['ˇ', ''], compile_snippet(source).map([{'tone': 3}, {'tone': 1}]))
+        self.assertEqual(7, compile_snippet('a + b')({'a': 3, 'b': 4}))
+
+    def test_namespace_is_built_once_per_morpheme(self):
+        rule_set = RuleSet({'x': {'then': [{'register': {'name': 'a', 'python': 'form * 2'}}, {'x': {'python': 'a + form'}}, {'y': {'python': 'x + a'}}]}})
+        env = Env('m', {'form': 'm'})
+        for rule in rule_set.rules:
+            rule(env)
+        self.assertEqual({'x': 'mmm', 'y': 'mmmmm'}, env.outputs)
+        self.assertIs(env.namespace(), env.namespace())
+
+    def test_waves(self):
+        lf = LangFactory(Paths.LANGUAGES, 'simple_sandhi_chinese')
+        language = lf.load()
+        self.assertEqual([[0, 1], [2]], lf.rules.waves)
+        self.assertEqual(lf.rules.apply_all(language), lf.rules.apply_waves(language))
+
+    def test_rules_run_after_their_inputs(self):
+        rule_set = RuleSet({'b': {'then': {'python': 'a * 2'}}, 'a': {'then': 'form'}, 'c': {'when': 'b', 'then': 'b'}})
+        self.assertEqual([[1], [0], [2]], rule_set.waves)
+        self.assertEqual({'a': 'm', 'b': 'mm', 'c': 'mm'}, rule_set.apply('m', {'form': 'm'}))
+
+    def test_fallbacks_of_a_feature(self):
+        rule_set = RuleSet({'x': [{'when': [{'not': 'x'}, 'a'], 'then': 1}, {'when': [{'not': 'x'}], 'then': 2}]})
+        self.assertEqual([[0], [1]], rule_set.waves)
+        self.assertEqual({'x': 1}, rule_set.apply('m', {'a': True}))
+        self.assertEqual({'x': 2}, rule_set.apply('m', {}))
+
+    def test_registers_are_seen_by_later_rules(self):
+        rule_set = RuleSet({'a': {'then': [{'register': {'name': 'r', 'python': '1'}}, 'r']}, 'b': {'when': ['r'], 'then': 'r'}})
+        morphemes = {'m': {}, 'n': {'form': 'n'}}
+        self.assertEqual([[0], [1]], rule_set.waves)
+        self.assertEqual({'a': 1, 'b': 1}, rule_set.apply('m', {}))
+        self.assertEqual({name: rule_set.apply(name, morpheme) for name, morpheme in morphemes.items()}, rule_set.apply_all(morphemes))
+        self.assertEqual(rule_set.apply_all(morphemes), rule_set.apply_waves(morphemes))
+
+    def test_rule_cycle(self):
+        with self.assertRaises(InvalidYamlException) as context:
+            RuleSet({'a': {'then': 'b'}, 'b': {'then': 'a'}, 'c': {'then': 'form'}})
+        self.assertEqual(Messages.RULE_CYCLE % 'a > b > a', context.exception.args[-1])
+
+    def test_candidates(self):
+        rule_set = RuleSet({'a': {'when': [{'is': 'morpheme'}, {'not': 'a'}, 'compound'], 'then': 'form'}, 'b': {'when': {'is': 'grapheme'}, 'then': 'form'}})
+        index = RuleIndex({'x': {'form': 'x'}, 'y': {'compound': ['x', 'x']}, 'z': {'compound': ['x'], 'a': 1}}, rule_set.rules[0].guards)
+        self.assertEqual([1], list(index.candidates(rule_set.rules[0])))
+        self.assertEqual([], list(index.candidates(rule_set.rules[1])))
+
+    def test_index_follows_the_rules(self):
+        rule_set = RuleSet({'marked': {'when': [{'not': 'marked'}, 'form'], 'then': True}, 'copy': {'when': ['marked', {'form': 'b'}], 'then': 'form'}})
+        morphemes = {'a': {'form': 'a'}, 'b': {'form': 'b'}, 'c': {'marked': True}, 'd': {}}
+        self.assertEqual({'a': {'marked': True}, 'b': {'marked': True, 'copy': 'b'}}, rule_set.apply_all(morphemes))
+        self.assertEqual({name: outputs for name in morphemes if (outputs := rule_set.apply(name, morphemes[name]))}, rule_set.apply_all(morphemes))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from src.constants import LangData
+from src.exceptions import InvalidYamlException, Messages
+from src.schema_validator import SchemaValidator
+from tests.lang_code_test import AbstractLangCodeTest
+
+
+class SchemaValidatorTest(AbstractLangCodeTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.validator = SchemaValidator()
+
+    def messages(self, morphemes: dict) -> list[str]:
+        return [error.args[-1] for error in self.validator.validate({LangData.MORPHEMES: morphemes})]
+
+    def test_valid_morphemes(self):
+        self.assertEqual([], self.messages({'女': {'form': '女', 'bound': True}, '女人': {'compound': ['女', '人']}}))
+
+    def test_collects_all_errors(self):
+        messages = self.messages({
+            '朋友': {'form': '朋友', 'compound': ['朋', '友']},
+            '友': {'pinyin': 'yǒu'},
+            '朋': None,
+            '人': {'form': '人', 'bound': 'yes please'},
+        })
+        self.assertEqual([Messages.FORMING_KEYS_TOGETHER, Messages.NO_FORMING_KEY, Messages.NOT_DEFINED % '朋', Messages.WRONG_TYPE % ('bound', 'bool')], messages)
+
+    def test_check_raises_with_every_error(self):
+        with self.assertRaises(InvalidYamlException) as context:
+            self.validator.check({LangData.MORPHEMES: {'a': {}, 'b': {}}})
+        self.assertEqual(Messages.NO_FORMING_KEY, context.exception.args[-1])
+        self.assertEqual(2, len(context.exception.errors))
+
+    def test_stream_raises_after_exhaustion(self):
+        seen = []
+        with self.assertRaises(InvalidYamlException):
+            for name, _ in self.validator.validated_morphemes(iter([('a', {}), ('b', {'form': 'b'})])):
+                seen.append(name)
+        self.assertEqual(['a', 'b'], seen)
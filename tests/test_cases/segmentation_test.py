@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from src.constants import LangData
+from src.lang_factory import LangaugeInterpreter, LangFactory
+from src.language import Language
+from src.loaders import LangDataDiff
+from src.morphemes import By, Side, SimpleMorphemeND
+from src.segmentation import CacheInfo, SegmentationCache, SegmentedWord, Segmenter, grapheme_inventory
+from src.utils import word_to_basics
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class SegmentationTest(AbstractLangCodeTest):
+    segmenter = Segmenter(['e', 'ei', 'eu', 's', 'sz', 'n', 'dż', 'd'])
+
+    def test_longest_match(self):
+        self.assertEqual(['ei', 'sz', 'e', 'n', 'dż', 'd'], list(self.segmenter.segment('eiszendżd')))
+        self.assertEqual(['e', 'a', 'eu'], list(word_to_basics('eaeu', ['e', 'ei', 'eu'])))
+
+    def test_missing_and_indexes(self):
+        self.assertEqual([('xy', 0), ('ei', 2), ('q', 4)], list(self.segmenter.segment('xyeiq', yield_index=True)))
+        self.assertEqual([('ei', 3)], list(self.segmenter.segment('xyeiq', skip_missing=True, yield_index=True, start_from_one=True)))
+        self.assertEqual([['s'], [], ['dż'], [('d', 0), ('z', 1)]], self.segmenter.segment_many(['s', '', 'dż']) + self.segmenter.segment_many(['dz'], yield_index=True))
+
+    def test_language_inventory(self):
+        language = LangFactory(Paths.LANGUAGES, 'toki_pona').load()
+        self.assertEqual(14, len(grapheme_inventory(language.graphemes)))
+        self.assertIs(language.segmenter, language.segmenter)
+        self.assertEqual(['t', 'o', 'k', 'i', ' ', 'p', 'o', 'n', 'a'], list(language.segmenter.segment('toki pona')))
+
+    def test_cache(self):
+        cache = SegmentationCache(self.segmenter, maxsize=2)
+        self.assertEqual([('ei', 2), ('s', 4)], list(cache.segment('xeis', skip_missing=True, yield_index=True, start_from_one=True)))
+        self.assertEqual(['x', 'ei', 's'], list(cache.segment('xeis')))
+        self.assertEqual((1, 3), cache.positions('xeis'))
+        cache.segment('eu')
+        list(cache.segment('sz'))
+        self.assertEqual(CacheInfo(hits=2, misses=3, evictions=1, size=2, maxsize=2), cache.info())
+        self.assertEqual(['eu', 'sz'], list(cache._entries))
+        cache.resize(1)
+        cache.invalidate(Segmenter(['x']))
+        self.assertEqual((0,), cache.positions('xeis'))
+        self.assertEqual((2, 4, 1 / 3), (cache.info().evictions, cache.info().misses, cache.info().hit_rate))
+
+    def test_language_cache_is_invalidated(self):
+        language = LangFactory(Paths.LANGUAGES, 'toki_pona').load()
+        cache = language.segmentation
+        cache.positions('toki')
+        self.assertIs(cache, language.segmentation)
+        self.assertEqual(1, len(language.segmentation))
+        language.graphemes['latin']['list'].append('ki')
+        self.assertEqual(1, len(language.segmentation))
+        language.invalidate()
+        self.assertEqual(0, len(language.segmentation))
+        self.assertEqual(['t', 'o', 'ki'], list(language.segmentation.segment('toki')))
+        LangaugeInterpreter().update(language, LangDataDiff(changed={LangData.GRAPHEMES: {'latin': {'list': ['t', 'o', 'to', 'ki']}}}))
+        self.assertEqual(['to', 'ki'], list(language.segmentation.segment('toki')))
+
+    def test_segmented_word(self):
+        word = SegmentedWord('szeiteu', {'V': Segmenter(['e', 'ei', 'eu', 'i']), 'C': self.segmenter})
+        self.assertEqual([(2, 2), (5, 2)], word.positions('V'))
+        self.assertEqual((5, 2), word.locate(-1, 'V'))
+        self.assertEqual((0, 1), word.locate(1))
+        self.assertIsNone(word.locate(3, 'V'))
+        with self.assertRaises(ValueError):
+            word.locate(9)
+        spliced = word.splice(4, 4, 'i')
+        self.assertEqual('szeiiteu', spliced.text)
+        self.assertEqual(['sz', 'ei', 'it', 'eu'], spliced.segments('C'))
+        self.assertEqual(SegmentedWord('szeiiteu', word.classes)._tokens['V'].starts, spliced._tokens['V'].starts)
+
+    def test_morphemes_on_segmented_words(self):
+        vowels = {'VOWELS': Segmenter(['a', 'e', 'ei', 'i', 'o', 'u'])}
+        word = SegmentedWord('kleid', vowels)
+        self.assertEqual('kleidchen', str(SimpleMorphemeND('', 'chen', at=-1)(word)))
+        self.assertEqual('kloeid', str(SimpleMorphemeND('', 'o', at=1, by=By.VOWELS)(word)))
+        self.assertEqual('kleiəd', str(SimpleMorphemeND('', 'ə', at=-1, by=By.VOWELS, side=Side.AFTER)(word)))
+        umlaut = SimpleMorphemeND('ei', 'ai', at=1, by=By.VOWELS)(word)
+        self.assertEqual(['a', 'i'], [umlaut.text[index:index + size] for index, size in umlaut.positions('VOWELS')])
+
+    def test_morphemes_share_the_step_segmentation_of_their_language(self):
+        language = Language('test', segmentation_maxsize=2)
+        language.graphemes = {'latin': {'list': ['a', 'au', 'e', 'f', 'l', 'n', 's']}}
+        umlaut = SimpleMorphemeND('a', 'ä', at=-2, by=By.VOWELS, language=language)
+        infix = SimpleMorphemeND('', 'x', at=-2, by=By.VOWELS, side=Side.AFTER, language=language)
+        self.assertEqual('läufen', umlaut('laufen'))
+        self.assertEqual('lauxfen', infix('laufen'))
+        self.assertFalse(umlaut.is_present('laufen'))
+        self.assertTrue(infix.is_applicable('laufen'))
+        self.assertEqual(CacheInfo(hits=3, misses=1, evictions=0, size=1, maxsize=2), language.segmentation_info()['VOWELS'])
+        self.assertEqual(['lexsen', 'xfall'], infix.apply_many(['lesen', 'fall']))
+        SimpleMorphemeND('', 'x', at=-2, by=By.VOWELS)('laufen')
+        self.assertEqual(CacheInfo(hits=3, misses=3, evictions=1, size=2, maxsize=2), language.segmentation_info()['VOWELS'])
+
+        language.graphemes['latin']['list'].remove('au')
+        language.invalidate()
+        self.assertEqual(0, language.segmentation_info()['VOWELS'].size)
+        self.assertEqual('laxufen', infix('laufen'))
+        self.assertIs(language.step_segmentation(By.VOWELS), language.step_segmentation(By.VOWELS))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from src.lang_factory import LangFactory
+from src.snapshot import CachedYamlLoader, SnapshotCache
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class SnapshotTest(AbstractLangCodeTest):
+    lang_name = 'simple_sandhi_chinese'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.languages = Path(self._tmp.name) / 'languages'
+        self.cache = Path(self._tmp.name) / 'cache'
+        shutil.copytree(Paths.LANGUAGES / self.lang_name, self.languages / self.lang_name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def load_with_loader(self) -> tuple[dict, CachedYamlLoader]:
+        loader = CachedYamlLoader(SnapshotCache(self.cache))
+        return loader.load(self.languages / self.lang_name), loader
+
+    def test_warm_load_parses_nothing(self):
+        cold, cold_loader = self.load_with_loader()
+        warm, warm_loader = self.load_with_loader()
+        self.assertEqual(3, len(cold_loader.parsed))
+        self.assertEqual([], warm_loader.parsed)
+        self.assertEqual(cold, warm)
+
+    def test_only_changed_file_is_parsed(self):
+        self.load_with_loader()
+        morphemes_path = self.languages / self.lang_name / 'morphemes.yaml'
+        morphemes_path.write_text(morphemes_path.read_text(encoding='utf-8') + '\n新:\n  form: 新\n', encoding='utf-8')
+        data, loader = self.load_with_loader()
+        self.assertEqual([morphemes_path], loader.parsed)
+        self.assertIn('新', data['morphemes'])
+
+    def test_touched_file_is_not_parsed(self):
+        self.load_with_loader()
+        (self.languages / self.lang_name / 'rules.yaml').touch()
+        _, loader = self.load_with_loader()
+        self.assertEqual([], loader.parsed)
+
+    def test_removed_file_is_dropped(self):
+        self.load_with_loader()
+        (self.languages / self.lang_name / 'rules.yaml').unlink()
+        data, loader = self.load_with_loader()
+        self.assertNotIn('rules', data)
+        self.assertNotIn('rules.yaml', loader.snapshot.files)
+
+    def test_warm_factory_load_reuses_language(self):
+        cold = LangFactory(self.languages, self.lang_name, cache_path=self.cache).load()
+        warm = LangFactory(self.languages, self.lang_name, cache_path=self.cache).load()
+        self.assertEqual(cold.name, warm.name)
+        self.assertEqual(cold.morphemes, warm.morphemes)
+        self.assertEqual(cold.rules, warm.rules)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from types import GeneratorType
+
+from parameterized import parameterized
+
+from src.constants import LangData
+from src.exceptions import InvalidYamlException, Messages
+from src.lang_factory import LangFactory
+from src.loaders import LangDataLoader, YamlFileLoader
+from src.schema_validator import validate_morphemes, validated_morphemes
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class StreamingTest(AbstractLangCodeTest):
+    @parameterized.expand([
+        ('toki_pona', ),
+        ('simplified_chinese', ),
+        ('only_compound', ),
+        ('sandhi_less_chinese', ),
+        ('simple_sandhi_chinese', ),
+        ('chinese', ),
+    ])
+    def test_same_items_as_safe_load(self, lang_name: str):
+        path = Paths.LANGUAGES / lang_name / 'morphemes.yaml'
+        loader = YamlFileLoader()
+        self.assertEqual(list(loader.load(path).items()), list(loader.iter_items(path)))
+
+    def test_empty_and_non_mapping_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            empty, listed = Path(tmp) / 'empty.yaml', Path(tmp) / 'list.yaml'
+            empty.write_text('# nothing yet\n')
+            listed.write_text('- a\n- b\n')
+            self.assertEqual([], list(YamlFileLoader().iter_items(empty)))
+            with self.assertRaises(InvalidYamlException):
+                list(YamlFileLoader().iter_items(listed))
+
+    def test_interpreter_consumes_stream(self):
+        data = LangDataLoader(Paths.LANGUAGES, 'simple_sandhi_chinese').load(stream=True)
+        self.assertIsInstance(data[LangData.MORPHEMES], GeneratorType)
+        lang = LangFactory(Paths.LANGUAGES, 'simple_sandhi_chinese').load(stream=True)
+        self.assertEqual(['我', '想', '我女'], lang.morphemes['我想我女'][LangData.COMPOUND])
+
+    def test_validator_consumes_stream(self):
+        valid = LangDataLoader(Paths.LANGUAGES, 'simple_sandhi_chinese').load(stream=True)
+        self.assertTrue(validate_morphemes(valid[LangData.MORPHEMES]))
+        invalid = LangDataLoader(Paths.LANGUAGES, 'only_compound').load(stream=True)
+        with self.assertRaises(InvalidYamlException) as context:
+            dict(validated_morphemes(invalid[LangData.MORPHEMES]))
+        self.assertEqual(Messages.FORMING_KEYS_TOGETHER, context.exception.args[-1])
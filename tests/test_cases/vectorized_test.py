@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from src.lang_factory import LangFactory
+from src.rules import RuleSet
+from src.vectorized import FeatureColumns, VectorizedRuleSet
+from tests.lang_code_test import AbstractLangCodeTest, Paths
+
+
+class VectorizedTest(AbstractLangCodeTest):
+    tone_marks = {'match': {'for': 'tone', 'cases': [{'case': 2, 'then': 'ˊ'}, {'case': 3, 'then': 'ˇ'}, {'then': ''}]}}
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.language = LangFactory(Paths.LANGUAGES, 'simple_sandhi_chinese').load()
+
+    def test_columns(self):
+        columns = FeatureColumns(self.language.morphemes)
+        tones, present = columns.column('tone')
+        self.assertEqual('int64', tones.dtype.name)
+        self.assertEqual(['女', '男', '人'], columns.names[:3])
+        self.assertEqual([3, 2, 2], tones[:3].tolist())
+        self.assertFalse(present[columns.names.index('我女')])
+
+    def test_simple_rules_run_on_columns(self):
+        rules = {
+            'mark': {'when': [{'is': 'morpheme'}, 'tone', {'bound': True}], 'then': self.tone_marks},
+            'copy': {'when': {'not': 'compound'}, 'then': [{'x': 'form'}, {'y': 3}, {'z': 'mark'}]},
+        }
+        vectorized = VectorizedRuleSet(rules)
+        results = vectorized.apply_all(self.language)
+        self.assertEqual([True, True], vectorized.vectorized)
+        self.assertEqual(RuleSet(rules).apply_all(self.language), results)
+        self.assertEqual({'mark': 'ˇ', 'x': '女', 'y': 3, 'z': 'ˇ'}, results['女'])
+        self.assertEqual({'x': '人', 'y': 3, 'z': None}, results['人'])
+
+    def test_other_rules_fall_back_to_rows(self):
+        vectorized = VectorizedRuleSet(self.language)
+        self.assertEqual([False, False, False], vectorized.vectorized)
+        self.assertEqual(RuleSet(self.language).apply_all(self.language), vectorized.apply_all(self.language))
+
+    def test_rows_see_column_outputs(self):
+        rules = {
+            'mark': {'when': 'tone', 'then': self.tone_marks},
+            'marked': {'when': 'mark', 'then': {'python': 'form + mark'}},
+        }
+        results = VectorizedRuleSet(rules).apply_all(self.language)
+        self.assertEqual([True, False], VectorizedRuleSet(rules).vectorized)
+        self.assertEqual('男ˊ', results['男']['marked'])
+        self.assertEqual(RuleSet(rules).apply_all(self.language), results)